@@ -2,6 +2,7 @@ import os
 import sys
 import types
 import pytest
+import respx
 
 
 @pytest.fixture(autouse=True)
@@ -11,17 +12,44 @@ def set_exa_api_key(monkeypatch):
     yield
 
 
-@pytest.fixture(autouse=True)
-def patch_mcp(monkeypatch):
-    """Provide minimal dummy modules under the `mcp` namespace so that the
-    server can be imported without the real `mcp` package installed.
+# Dummy classes used by the stub `mcp` modules.  They are defined once at
+# import time rather than inside the fixture so every test shares the same
+# class objects.
+class DummyTool:
+    def __init__(self, *args, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
 
-    The server imports several submodules from `mcp.server` and uses
-    `mcp.types.TextContent` and `mcp.types.Tool` for type annotations.  This
-    fixture installs dummy modules into `sys.modules` that satisfy these
-    imports and provide basic placeholder classes.  The dummy modules are
-    cleaned up automatically between tests by monkeypatch.
-    """
+
+class DummyTextContent:
+    def __init__(self, type: str, text: str):
+        self.type = type
+        self.text = text
+
+    @classmethod
+    def model_construct(cls, **kwargs):
+        return cls(**kwargs)
+
+
+# For lowlevel.Server we just use a simple object placeholder.  Tests that
+# need more complex behaviour will monkeypatch it to a FakeServer.
+class DummyServer:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def list_tools(self):
+        def decorator(func):
+            return func
+        return decorator
+
+    def call_tool(self, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+def _build_mcp_modules():
+    """Build the stub `mcp` module tree keyed by its `sys.modules` name."""
     # Create a top-level mcp module
     mcp = types.ModuleType("mcp")
     # Create submodules
@@ -31,59 +59,106 @@ def patch_mcp(monkeypatch):
     stream_mod = types.ModuleType("mcp.server.streamable_http_manager")
     types_mod = types.ModuleType("mcp.types")
 
-    # Define dummy classes used by server
-    class DummyTool:
-        def __init__(self, *args, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-
-    class DummyTextContent:
-        def __init__(self, type: str, text: str):
-            self.type = type
-            self.text = text
-
     # Assign attributes
     types_mod.Tool = DummyTool
     types_mod.TextContent = DummyTextContent
-
-    # For lowlevel.Server we just use a simple object placeholder.  Tests that
-    # need more complex behaviour will monkeypatch it to a FakeServer.
-    class DummyServer:
-        def __init__(self, *args, **kwargs):
-            pass
-
-        def list_tools(self):
-            def decorator(func):
-                return func
-            return decorator
-
-        def call_tool(self):
-            def decorator(func):
-                return func
-            return decorator
-
     lowlevel_mod.Server = DummyServer
     sse_mod.SseServerTransport = object
     stream_mod.StreamableHTTPSessionManager = object
 
-    # Attach submodules to mcp namespace
-    server_mod.lowlevel = lowlevel_mod
-    server_mod.sse = sse_mod
-    server_mod.streamable_http_manager = stream_mod
-
-    # Make `mcp.server.lowlevel` available via attribute access
+    # Make `mcp.server.lowlevel` and friends available via attribute access
     mcp.server = server_mod
     mcp.server.lowlevel = lowlevel_mod
     mcp.server.sse = sse_mod
     mcp.server.streamable_http_manager = stream_mod
     mcp.types = types_mod
 
-    # Register modules in sys.modules
-    monkeypatch.setitem(sys.modules, "mcp", mcp)
-    monkeypatch.setitem(sys.modules, "mcp.server", server_mod)
-    monkeypatch.setitem(sys.modules, "mcp.server.lowlevel", lowlevel_mod)
-    monkeypatch.setitem(sys.modules, "mcp.server.sse", sse_mod)
-    monkeypatch.setitem(sys.modules, "mcp.server.streamable_http_manager", stream_mod)
-    monkeypatch.setitem(sys.modules, "mcp.types", types_mod)
+    return {
+        "mcp": mcp,
+        "mcp.server": server_mod,
+        "mcp.server.lowlevel": lowlevel_mod,
+        "mcp.server.sse": sse_mod,
+        "mcp.server.streamable_http_manager": stream_mod,
+        "mcp.types": types_mod,
+    }
+
+
+_previous_mcp_modules = {}
+
+
+def pytest_configure(config):
+    """Provide minimal dummy modules under the `mcp` namespace so that the
+    server can be imported without the real `mcp` package installed.
+
+    The server imports several submodules from `mcp.server` and uses
+    `mcp.types.TextContent` and `mcp.types.Tool` for type annotations.  The
+    dummy modules are installed into `sys.modules` once, before collection,
+    so test modules can import `server` at module level.
+    """
+    modules = _build_mcp_modules()
+    _previous_mcp_modules.update({name: sys.modules.get(name) for name in modules})
+    sys.modules.update(modules)
+
+
+def pytest_unconfigure(config):
+    """Restore any `sys.modules` entries replaced by the `mcp` stubs."""
+    for name, module in _previous_mcp_modules.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _previous_mcp_modules.clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _exa_routes():
+    """Mock every Exa route with one respx router for the whole session.
+
+    Compiling the route patterns and patching the httpx transport once
+    avoids repeating that work for each test; tests only swap the mocked
+    responses.  Requests to unregistered URLs still fail.
+    """
+    # Imported in the fixtures: this conftest is loaded before
+    # pytest_configure installs the `mcp` stubs that `server` needs
+    import server
+    router = respx.mock(assert_all_called=False, using="httpx")
+    router.post(server.EXA_SEARCH_ENDPOINT, name="search")
+    router.post(server.EXA_CONTENTS_ENDPOINT, name="contents")
+    router.post(server.EXA_FIND_SIMILAR_ENDPOINT, name="similar")
+    router.post(server.EXA_ANSWER_ENDPOINT, name="answer")
+    router.post(server.EXA_RESEARCH_TASKS_ENDPOINT, name="research")
+    router.get(url__startswith=f"{server.EXA_RESEARCH_TASKS_ENDPOINT}/", name="research_poll")
+    with router:
+        yield router
+
 
+@pytest.fixture(autouse=True)
+def exa_router(_exa_routes):
+    """Give a test the session router and undo its changes afterwards.
+
+    Responses mocked by the test are rolled back and the recorded calls are
+    cleared, so every test starts from unmocked routes.
+    """
+    _exa_routes.snapshot()
+    yield _exa_routes
+    _exa_routes.rollback()
+
+
+@pytest.fixture(autouse=True)
+def _clear_exa_caches():
+    """Drop cached Exa results so no test sees another test's responses."""
+    import server
+    yield
+    server._clear_caches()
+
+
+@pytest.fixture(autouse=True)
+def _clear_config_cache():
+    """Forget the cached :func:`server.get_config` after each test.
+
+    Tests that change the environment then see their own settings, and the
+    session-wide ``server`` import never needs reloading.
+    """
+    import server
     yield
+    server.get_config.cache_clear()
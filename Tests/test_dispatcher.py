@@ -1,22 +1,21 @@
-import json
-import pytest
+import asyncio
+from unittest.mock import AsyncMock
 
+import msgspec
+import pytest
 
-pytestmark = pytest.mark.asyncio
+import server as _server
 
 
 class FakeServer:
     """A minimal stand‑in for `mcp.server.lowlevel.Server` used in dispatcher tests.
 
     It records the functions decorated via `list_tools()` and `call_tool()` so
-    they can be invoked directly in the test.  The last created instance is
-    stored on the class for easy access.
+    they can be invoked directly in the test.  Pass it to
+    ``build_mcp_server(server_cls=FakeServer)``, which returns the instance.
     """
 
-    last_instance = None
-
     def __init__(self, *args, **kwargs):
-        type(self).last_instance = self
         self.registered_list_tools = None
         self.registered_call_tool = None
 
@@ -26,141 +25,206 @@ class FakeServer:
             return func
         return decorator
 
-    def call_tool(self):
+    def call_tool(self, **kwargs):
         def decorator(func):
             self.registered_call_tool = func
             return func
         return decorator
 
 
-class Dummy:
-    """A no‑op placeholder for SseServerTransport and StreamableHTTPSessionManager."""
-
-    def __init__(self, *args, **kwargs):
-        pass
+# Search results shared by the web search tests
+_RESULTS_A_B = (
+    _server.SearchResult(title="A", url="https://a.com", snippet="sa"),
+    _server.SearchResult(title="B", url="https://b.com", snippet="sb"),
+)
 
 
-class DummyStarlette:
-    """A minimal stand‑in for starlette.applications.Starlette used in tests.
+async def _fetch_page(url, no_cache=False):
+    return _server.Page(title="Page", url=url, text=f"CONTENT {url}")
 
-    The dispatcher tests do not exercise the ASGI app, so this class simply
-    captures constructor arguments and returns an object with a dummy `routes`
-    attribute.
-    """
 
-    def __init__(self, *args, **kwargs):
-        self.args = args
-        self.kwargs = kwargs
-        self.routes = kwargs.get("routes", [])
+def _bulk_fetch_fails():
+    """A bulk contents fetch that fails, so every page is fetched on its own."""
+    return AsyncMock(side_effect=Exception("bulk failure"))
 
 
-def patch_dispatcher(monkeypatch):
-    """Patch the server module to replace MCP constructs with test doubles.
+@pytest.fixture(scope="module")
+def call_tool():
+    """Build the MCP server once and return its registered ``call_tool`` handler.
 
-    Returns a function that takes the imported server module as input and
-    applies all necessary monkeypatches.  This indirection allows each test
-    to import the server after the monkeypatch fixture has prepared the
-    environment.
+    The handler looks up the tool helpers on the module at call time, so tests
+    can still monkeypatch them individually.
     """
+    return _server.build_mcp_server(server_cls=FakeServer).registered_call_tool
+
 
-    def _apply(server):
-        # Replace Server with FakeServer
-        monkeypatch.setattr(server, "Server", FakeServer)
-        # Replace transports with dummy objects
-        monkeypatch.setattr(server, "SseServerTransport", Dummy)
-        monkeypatch.setattr(server, "StreamableHTTPSessionManager", Dummy)
-        # Replace Starlette and routing classes
-        monkeypatch.setattr(server, "Starlette", DummyStarlette)
-        monkeypatch.setattr(server, "Route", lambda *args, **kwargs: None)
-        monkeypatch.setattr(server, "Mount", lambda *args, **kwargs: None)
-        # Provide a dummy TextContent for return values
-        class DummyTextContent:
-            def __init__(self, type: str, text: str):
-                self.type = type
-                self.text = text
-        monkeypatch.setattr(server.types, "TextContent", DummyTextContent)
-        return server
-
-    return _apply
-
-
-@pytest.mark.asyncio
-async def test_call_tool_web_search_with_enrichment_success(monkeypatch):
-    import server
-    apply = patch_dispatcher(monkeypatch)
-    srv = apply(server)
-    # Patch helper functions to control behaviour
-    async def fake_web_search(query, num_results):
-        return [{"title": "T", "url": "https://a.com", "snippet": "snip"}]
-
-    async def fake_fetch_contents(urls, livecrawl=None):
-        return [{"title": "T", "url": "https://a.com", "text": "FULL"}]
-
-    monkeypatch.setattr(srv, "exa_web_search", fake_web_search)
-    monkeypatch.setattr(srv, "exa_fetch_contents", fake_fetch_contents)
-    # Build the app (creates FakeServer.last_instance)
-    srv.build_mcp_server()
-    call_tool_func = FakeServer.last_instance.registered_call_tool
-    result = await call_tool_func("exa_web_search", {"query": "q", "num_results": 1, "include_text": True})
+def _check_enriched(text):
     # Result is a list with a single DummyTextContent. Parse JSON in text.
-    data = json.loads(result[0].text)
-    assert data[0]["text"] == "FULL"
-
-
-@pytest.mark.asyncio
-async def test_call_tool_web_search_with_enrichment_fallback(monkeypatch):
-    import server
-    apply = patch_dispatcher(monkeypatch)
-    srv = apply(server)
-    # Patch helper functions
-    async def fake_web_search(query, num_results):
-        return [
-            {"title": "A", "url": "https://a.com", "snippet": "sa"},
-            {"title": "B", "url": "https://b.com", "snippet": "sb"},
+    assert msgspec.json.decode(text)[0]["text"] == "FULL"
+
+
+def _check_fetched_each_page(text):
+    # The fallback should fetch each url on its own
+    data = msgspec.json.decode(text)
+    assert [item["text"] for item in data] == ["CONTENT https://a.com", "CONTENT https://b.com"]
+
+
+def _check_invalid_target(text):
+    # The schema violation is reflected in the error message
+    assert text.startswith("Error:")
+    assert "subpage_target" in text
+
+
+def _check_unknown_tool(text):
+    assert text == "Error: Unknown tool 'nonexistent_tool'"
+
+
+@pytest.mark.parametrize(
+    "tool, arguments, patches, check",
+    [
+        pytest.param(
+            "exa_web_search",
+            {"query": "q", "num_results": 1, "include_text": True},
+            {
+                "exa_web_search": AsyncMock(
+                    return_value=[_server.SearchResult(title="T", url="https://a.com", snippet="snip")]
+                ),
+                "exa_fetch_contents": AsyncMock(
+                    return_value=[_server.Page(title="T", url="https://a.com", text="FULL")]
+                ),
+            },
+            _check_enriched,
+            id="web_search_enrichment_success",
+        ),
+        pytest.param(
+            "exa_web_search",
+            {"query": "q", "num_results": 2, "include_text": True},
+            {
+                "exa_web_search": AsyncMock(return_value=list(_RESULTS_A_B)),
+                "exa_fetch_contents": _bulk_fetch_fails(),
+                "_fetch_page": AsyncMock(side_effect=_fetch_page),
+            },
+            _check_fetched_each_page,
+            id="web_search_enrichment_fallback",
+        ),
+        pytest.param(
+            "exa_fetch_subpages",
+            {"url": "https://example.com", "subpage_target": "not-a-list"},
+            {},
+            _check_invalid_target,
+            id="subpages_invalid_target",
+        ),
+        pytest.param("nonexistent_tool", {}, {}, _check_unknown_tool, id="unknown_tool"),
+    ],
+)
+async def test_call_tool(call_tool, monkeypatch, tool, arguments, patches, check):
+    for name, fake in patches.items():
+        monkeypatch.setattr(_server, name, fake)
+    result = await call_tool(tool, arguments)
+    check(result[0].text)
+
+
+async def test_call_tool_web_search_enrichment_dedupes_urls(call_tool, monkeypatch):
+    search = AsyncMock(
+        return_value=[
+            _server.SearchResult(title="A", url="https://a.com", snippet="sa"),
+            _server.SearchResult(title="A again", url="https://a.com", snippet="sa2"),
+            _server.SearchResult(title="No URL", url=None, snippet="none"),
         ]
-
-    async def fake_fetch_contents(urls, livecrawl=None):
-        # Simulate failure by raising an exception
-        raise Exception("bulk failure")
-
-    async def fake_fetch_content(url):
-        return {"title": "Page", "url": url, "text": f"CONTENT {url}"}
-
-    monkeypatch.setattr(srv, "exa_web_search", fake_web_search)
-    monkeypatch.setattr(srv, "exa_fetch_contents", fake_fetch_contents)
-    monkeypatch.setattr(srv, "exa_fetch_content", fake_fetch_content)
-    srv.build_mcp_server()
-    call_tool_func = FakeServer.last_instance.registered_call_tool
-    result = await call_tool_func("exa_web_search", {"query": "q", "num_results": 2, "include_text": True})
-    data = json.loads(result[0].text)
-    # The fallback should call exa_fetch_content for each url
+    )
+    fetch_contents = AsyncMock(return_value=[_server.Page(title="A", url="https://a.com", text="FULL")])
+    monkeypatch.setattr(_server, "exa_web_search", search)
+    monkeypatch.setattr(_server, "exa_fetch_contents", fetch_contents)
+    result = await call_tool("exa_web_search", {"query": "q", "num_results": 3, "include_text": True})
+    data = msgspec.json.decode(result[0].text)
+    # Each URL is fetched once and shared by every result that points at it
+    fetch_contents.assert_awaited_once_with(urls=["https://a.com"], no_cache=False)
+    assert data[0]["text"] == data[1]["text"] == "FULL"
+    assert data[2]["snippet"] == "none"
+
+
+async def test_call_tool_web_search_fallback_fetches_pages_concurrently(call_tool, monkeypatch):
+    active = peak = 0
+
+    async def fake_fetch_page(url, no_cache=False):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return await _fetch_page(url)
+
+    monkeypatch.setattr(_server, "exa_web_search", AsyncMock(return_value=list(_RESULTS_A_B)))
+    monkeypatch.setattr(_server, "exa_fetch_contents", _bulk_fetch_fails())
+    monkeypatch.setattr(_server, "_fetch_page", fake_fetch_page)
+    result = await call_tool("exa_web_search", {"query": "q", "num_results": 2, "include_text": True})
+    data = msgspec.json.decode(result[0].text)
+    # The fallback should fetch each url on its own
     assert data[0]["text"] == "CONTENT https://a.com"
     assert data[1]["text"] == "CONTENT https://b.com"
+    # ...and the fetches overlap rather than running one after another
+    assert peak == 2
+
+
+async def test_call_tool_web_search_fallback_keeps_failed_results(call_tool, monkeypatch):
+    async def fake_fetch_page(url, no_cache=False):
+        if url == "https://a.com":
+            raise Exception("page failure")
+        return await _fetch_page(url)
+
+    monkeypatch.setattr(_server, "exa_web_search", AsyncMock(return_value=list(_RESULTS_A_B)))
+    monkeypatch.setattr(_server, "exa_fetch_contents", _bulk_fetch_fails())
+    monkeypatch.setattr(_server, "_fetch_page", fake_fetch_page)
+    result = await call_tool("exa_web_search", {"query": "q", "num_results": 2, "include_text": True})
+    data = msgspec.json.decode(result[0].text)
+    # The failed page keeps its search result; order is preserved
+    assert data[0] == {"title": "A", "url": "https://a.com", "snippet": "sa"}
+    assert data[1]["text"] == "CONTENT https://b.com"
 
 
-@pytest.mark.asyncio
-async def test_call_tool_subpages_invalid_target(monkeypatch):
-    import server
-    apply = patch_dispatcher(monkeypatch)
-    srv = apply(server)
-    # Build the server to register call_tool
-    srv.build_mcp_server()
-    call_tool_func = FakeServer.last_instance.registered_call_tool
-    # Provide a non-list subpage_target
-    result = await call_tool_func(
-        "exa_fetch_subpages",
-        {"url": "https://example.com", "subpage_target": "not-a-list"},
-    )
-    # Expect a ValueError reflected in the error message
-    assert "subpage_target" in result[0].text
-
-
-@pytest.mark.asyncio
-async def test_call_tool_unknown_tool(monkeypatch):
-    import server
-    apply = patch_dispatcher(monkeypatch)
-    srv = apply(server)
-    srv.build_mcp_server()
-    call_tool_func = FakeServer.last_instance.registered_call_tool
-    result = await call_tool_func("nonexistent_tool", {})
-    assert "Unknown tool" in result[0].text
+async def test_call_tool_web_search_fallback_skips_results_without_url(call_tool, monkeypatch):
+    results = [*_RESULTS_A_B, _server.SearchResult(title="No URL", url=None, snippet="none")]
+    fetch_page = AsyncMock(side_effect=_fetch_page)
+    monkeypatch.setattr(_server, "exa_web_search", AsyncMock(return_value=results))
+    monkeypatch.setattr(_server, "exa_fetch_contents", _bulk_fetch_fails())
+    monkeypatch.setattr(_server, "_fetch_page", fetch_page)
+    result = await call_tool("exa_web_search", {"query": "q", "num_results": 3, "include_text": True})
+    data = msgspec.json.decode(result[0].text)
+    # Only real URLs are fetched; the URL-less result is returned unchanged
+    assert sorted(call.args[0] for call in fetch_page.await_args_list) == ["https://a.com", "https://b.com"]
+    assert [item.get("text") for item in data[:2]] == ["CONTENT https://a.com", "CONTENT https://b.com"]
+    assert data[2] == {"title": "No URL", "url": None, "snippet": "none"}
+
+
+async def test_call_tool_rejects_arguments_not_matching_schema(call_tool, monkeypatch, caplog):
+    search = AsyncMock(return_value=[])
+    monkeypatch.setattr(_server, "exa_web_search", search)
+    result = await call_tool("exa_web_search", {"query": ""})
+    assert result[0].text.startswith("Error:")
+    assert "query" in result[0].text
+    search.assert_not_awaited()
+    # Invalid arguments are a client error, logged without a traceback
+    records = [r for r in caplog.records if r.name == "server"]
+    assert [r.levelname for r in records] == ["WARNING"]
+    assert records[0].exc_info is None
+
+
+async def test_call_tool_fills_in_schema_defaults(call_tool, monkeypatch):
+    search = AsyncMock(return_value=[])
+    monkeypatch.setattr(_server, "exa_web_search", search)
+    await call_tool("exa_web_search", {"query": "q"})
+    search.assert_awaited_once_with(query="q", num_results=3, no_cache=False)
+
+
+async def test_call_tool_reuses_unknown_tool_response(call_tool):
+    result = await call_tool("nonexistent_tool", {})
+    assert await call_tool("nonexistent_tool", {}) is result
+
+
+async def test_list_tools_returns_prebuilt_tools():
+    list_tools_func = _server.build_mcp_server(server_cls=FakeServer).registered_list_tools
+    tools = await list_tools_func()
+    # The same prebuilt Tool objects are served on every call
+    assert tools == list(_server._TOOLS)
+    assert all(a is b for a, b in zip(await list_tools_func(), tools))
+    assert "exa_web_search" in {tool.name for tool in tools}
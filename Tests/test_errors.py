@@ -1,61 +1,73 @@
 import pytest
-import respx
 import httpx
 
+import server as _server
 
-pytestmark = pytest.mark.asyncio
 
+# Responses are built once and shared; respx clones a reused Response for
+# every request it answers.
+_NO_RESULTS_RESP = httpx.Response(status_code=200, json={"results": []})
+_UNAUTHORIZED_RESP = httpx.Response(status_code=401)
+_UNAVAILABLE_RESP = httpx.Response(status_code=503)
+_RATE_LIMITED_RESP = httpx.Response(status_code=429, headers={"Retry-After": "0"})
+_SEARCH_OK_RESP = httpx.Response(status_code=200, json={"results": [{"title": "A", "url": "https://a.com"}]})
 
-def _json_response(data, status_code=200):
-    return httpx.Response(status_code=status_code, json=data)
 
-
-@respx.mock
 async def test_missing_api_key_raises(monkeypatch):
-    # Import server after patching environment and mcp modules
-    import server
-    # Temporarily clear the API key on the module
-    monkeypatch.setattr(server, "EXA_API_KEY", "")
+    # Temporarily clear the API key in the loaded configuration
+    config = _server.Config(api_key="", port=5000, json_response=False, debug=False, cache_ttl=0)
+    monkeypatch.setattr(_server, "get_config", lambda: config)
     with pytest.raises(Exception) as e:
-        await server.exa_web_search("q")
+        await _server.exa_web_search("q")
     assert "EXA_API_KEY" in str(e.value)
 
 
-@respx.mock
-async def test_exa_fetch_contents_requires_non_empty_urls(monkeypatch):
-    import server
+async def test_exa_fetch_contents_requires_non_empty_urls():
     with pytest.raises(Exception):
-        await server.exa_fetch_contents([], livecrawl=None)
+        await _server.exa_fetch_contents([], livecrawl=None)
 
 
-@respx.mock
-async def test_exa_fetch_content_no_results_raises():
-    import server
+async def test_exa_fetch_content_no_results_raises(exa_router):
     # Simulate Exa returning no results for a bad URL
-    respx.post(server.EXA_CONTENTS_ENDPOINT).mock(
-        return_value=httpx.Response(status_code=200, json={"results": []})
-    )
+    exa_router["contents"].mock(return_value=_NO_RESULTS_RESP)
     with pytest.raises(Exception) as e:
-        await server.exa_fetch_content("https://missing.com")
+        await _server.exa_fetch_content("https://missing.com")
     assert "No content returned" in str(e.value)
 
 
-@respx.mock
-async def test_exa_fetch_subpages_no_results_raises():
-    import server
-    respx.post(server.EXA_CONTENTS_ENDPOINT).mock(
-        return_value=httpx.Response(status_code=200, json={"results": []})
-    )
+async def test_exa_fetch_subpages_no_results_raises(exa_router):
+    exa_router["contents"].mock(return_value=_NO_RESULTS_RESP)
     with pytest.raises(Exception):
-        await server.exa_fetch_subpages("https://root.com")
+        await _server.exa_fetch_subpages("https://root.com")
 
 
-@respx.mock
-async def test_http_error_bubbles_up():
-    import server
+async def test_http_error_bubbles_up(exa_router):
     # Simulate non-2xx status
-    respx.post(server.EXA_SEARCH_ENDPOINT).mock(
-        return_value=httpx.Response(status_code=401)
-    )
+    exa_router["search"].mock(return_value=_UNAUTHORIZED_RESP)
+    with pytest.raises(httpx.HTTPStatusError):
+        await _server.exa_web_search("q")
+    assert exa_router["search"].call_count == 1
+
+
+async def test_transient_errors_are_retried(exa_router, monkeypatch):
+    monkeypatch.setattr(_server, "EXA_RETRY_BASE_DELAY", 0)
+    route = exa_router["search"].mock(side_effect=[_RATE_LIMITED_RESP, _UNAVAILABLE_RESP, _SEARCH_OK_RESP])
+    results = await _server.exa_web_search("q")
+    assert route.call_count == 3
+    assert results[0].title == "A"
+
+
+async def test_retries_give_up_after_last_attempt(exa_router, monkeypatch):
+    monkeypatch.setattr(_server, "EXA_RETRY_BASE_DELAY", 0)
+    route = exa_router["search"].mock(return_value=_UNAVAILABLE_RESP)
+    with pytest.raises(httpx.HTTPStatusError):
+        await _server.exa_web_search("q")
+    assert route.call_count == _server.EXA_RETRY_ATTEMPTS
+
+
+async def test_research_start_is_not_retried_on_server_errors(exa_router, monkeypatch):
+    monkeypatch.setattr(_server, "EXA_RETRY_BASE_DELAY", 0)
+    route = exa_router["research"].mock(return_value=_UNAVAILABLE_RESP)
     with pytest.raises(httpx.HTTPStatusError):
-        await server.exa_web_search("q")
+        await _server.exa_research_start("Find X")
+    assert route.call_count == 1
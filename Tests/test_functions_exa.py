@@ -1,191 +1,432 @@
+import asyncio
 import json
 import pytest
-import respx
 import httpx
 
+import server as _server
 
-pytestmark = pytest.mark.asyncio
 
+_RESEARCH = _server.EXA_RESEARCH_TASKS_ENDPOINT
 
-def _json_response(data, status_code=200):
-    return httpx.Response(status_code=status_code, json=data)
 
+def _sent_json(route):
+    """Decode the JSON body of the last request sent through ``route``."""
+    return json.loads(route.calls[-1].request.content)
 
-@respx.mock
-async def test_exa_web_search_basic(monkeypatch):
-    import server
-    # Mock the Exa search endpoint
-    route = respx.post(server.EXA_SEARCH_ENDPOINT).mock(
-        return_value=_json_response(
-            {
-                "results": [
-                    {"title": "A", "url": "https://a.com", "text": "alpha"},
-                    {"title": "B", "url": "https://b.com", "summary": "bravo"},
-                ]
-            }
-        )
-    )
-    results = await server.exa_web_search("hello", num_results=2)
-    assert route.called
-    assert len(results) == 2
-    assert results[0]["title"] == "A"
-    assert results[0]["snippet"] == "alpha"
-    assert results[1]["snippet"] == "bravo"  # falls back to summary
 
-
-@respx.mock
-async def test_exa_fetch_content_single():
-    import server
-    route = respx.post(server.EXA_CONTENTS_ENDPOINT).mock(
-        return_value=_json_response(
+# Static Exa payloads are built once at import; respx clones a reused
+# Response for every request, so sharing them between tests is safe.
+_SEARCH_RESP = httpx.Response(
+    200,
+    json={
+        "results": [
+            {"title": "A", "url": "https://a.com", "text": "alpha"},
+            {"title": "B", "url": "https://b.com", "summary": "bravo"},
+        ]
+    },
+)
+_CONTENTS_SINGLE_RESP = httpx.Response(
+    200,
+    json={
+        "results": [
+            {"title": "Page", "url": "https://x.com", "text": "CONTENT"}
+        ]
+    },
+)
+_CONTENTS_BULK_RESP = httpx.Response(
+    200,
+    json={
+        "results": [
+            {"title": "P1", "url": "https://1.com", "text": "T1"},
+            {"title": "P2", "url": "https://2.com", "text": "T2"},
+        ]
+    },
+)
+_SIMILAR_RESP = httpx.Response(
+    200,
+    json={
+        "results": [
+            {"title": "Rel1", "url": "https://r1.com", "score": 0.9, "summary": "S"},
+            {"title": "Rel2", "url": "https://r2.com", "score": 0.8, "text": "FULL"},
+        ]
+    },
+)
+_SIMILAR_WITH_TEXT_RESP = httpx.Response(
+    200,
+    json={
+        "results": [
+            {"title": "Rel", "url": "https://r.com", "score": 0.77, "text": "BODY"}
+        ]
+    },
+)
+_ANSWER_RESP = httpx.Response(
+    200,
+    json={
+        "answer": "42",
+        "citations": [{"title": "Deep Thought"}],
+    },
+)
+_RESEARCH_START_RESP = httpx.Response(200, json={"id": "task_123"})
+_RESEARCH_POLL_RESP = httpx.Response(
+    200,
+    json={"id": "task_123", "status": "complete", "data": {"ok": True}},
+)
+_SUBPAGES_RESP = httpx.Response(
+    200,
+    json={
+        "results": [
             {
-                "results": [
-                    {"title": "Page", "url": "https://x.com", "text": "CONTENT"}
-                ]
+                "title": "Root",
+                "url": "https://root.com",
+                "text": "ROOT",
+                "subpages": [
+                    {"title": "About", "url": "https://root.com/about", "text": "ABOUT"},
+                    {"title": "News", "url": "https://root.com/news", "text": "NEWS"},
+                ],
             }
-        )
-    )
-    data = await server.exa_fetch_content("https://x.com")
-    assert route.called
-    assert data["title"] == "Page"
-    assert data["text"] == "CONTENT"
+        ]
+    },
+)
 
 
-@respx.mock
-async def test_exa_fetch_contents_bulk():
-    import server
-    route = respx.post(server.EXA_CONTENTS_ENDPOINT).mock(
-        return_value=_json_response(
-            {
-                "results": [
-                    {"title": "P1", "url": "https://1.com", "text": "T1"},
-                    {"title": "P2", "url": "https://2.com", "text": "T2"},
-                ]
-            }
-        )
-    )
-    data = await server.exa_fetch_contents(["https://1.com", "https://2.com"], livecrawl="preferred")
+async def test_exa_web_search_basic(exa_router):
+    # Mock the Exa search endpoint
+    route = exa_router["search"].mock(return_value=_SEARCH_RESP)
+    results = await _server.exa_web_search("hello", num_results=2)
     assert route.called
-    sent = route.calls[-1].request
-    payload = json.loads(sent.content)
-    assert payload["urls"] == ["https://1.com", "https://2.com"]
-    assert payload["text"] is True
-    assert payload["livecrawl"] == "preferred"
-    assert {d["url"] for d in data} == {"https://1.com", "https://2.com"}
+    assert route.calls[-1].request.headers["x-api-key"] == "test-key"
+    assert _sent_json(route)["numResults"] == 2
+    assert len(results) == 2
+    assert results[0].title == "A"
+    assert results[0].snippet == "alpha"
+    assert results[1].snippet == "bravo"  # falls back to summary
 
 
-@respx.mock
-async def test_exa_find_similar_links_without_text():
-    import server
-    route = respx.post(server.EXA_FIND_SIMILAR_ENDPOINT).mock(
-        return_value=_json_response(
-            {
-                "results": [
-                    {"title": "Rel1", "url": "https://r1.com", "score": 0.9, "summary": "S"},
-                    {"title": "Rel2", "url": "https://r2.com", "score": 0.8, "text": "FULL"},
-                ]
-            }
-        )
-    )
-    out = await server.exa_find_similar_links("https://seed.com", include_text=False, num_results=2)
+async def test_exa_find_similar_links_without_text(exa_router):
+    route = exa_router["similar"].mock(return_value=_SIMILAR_RESP)
+    out = await _server.exa_find_similar_links("https://seed.com", include_text=False, num_results=2)
     assert route.called
-    assert out[0]["text"] is None  # not included when include_text=False
-    assert out[1]["text"] is None
+    assert _sent_json(route)["numResults"] == 2
+    assert out[0].text is None  # not included when include_text=False
+    assert out[1].text is None
 
 
-@respx.mock
-async def test_exa_find_similar_links_with_text():
-    import server
-    route = respx.post(server.EXA_FIND_SIMILAR_ENDPOINT).mock(
-        return_value=_json_response(
-            {
-                "results": [
-                    {"title": "Rel", "url": "https://r.com", "score": 0.77, "text": "BODY"}
-                ]
-            }
-        )
-    )
-    out = await server.exa_find_similar_links("https://seed.com", include_text=True, num_results=1)
+async def test_exa_find_similar_links_with_text(exa_router):
+    route = exa_router["similar"].mock(return_value=_SIMILAR_WITH_TEXT_RESP)
+    out = await _server.exa_find_similar_links("https://seed.com", include_text=True, num_results=1)
     assert route.called
-    assert out[0]["text"] == "BODY"
+    assert out[0].text == "BODY"
 
 
-@respx.mock
-async def test_exa_answer_question_basic():
-    import server
-    route = respx.post(server.EXA_ANSWER_ENDPOINT).mock(
-        return_value=_json_response(
-            {
-                "answer": "42",
-                "citations": [{"title": "Deep Thought"}],
-            }
-        )
-    )
-    out = await server.exa_answer_question("What is?", include_text=False)
+async def test_exa_answer_question_basic(exa_router):
+    route = exa_router["answer"].mock(return_value=_ANSWER_RESP)
+    out = await _server.exa_answer_question("What is?", include_text=False)
     assert route.called
     assert out["answer"] == "42"
     assert "citations" in out
 
 
-@respx.mock
-async def test_exa_research_start_with_schema_and_model():
-    import server
-    route = respx.post(server.EXA_RESEARCH_TASKS_ENDPOINT).mock(
-        return_value=_json_response({"id": "task_123"})
-    )
+async def test_exa_research_start_with_schema_and_model(exa_router):
+    route = exa_router["research"].mock(return_value=_RESEARCH_START_RESP)
     schema = {"type": "object", "properties": {"k": {"type": "string"}}}
-    out = await server.exa_research_start(
+    out = await _server.exa_research_start(
         instructions="Find X",
         model="exa-research-pro",
         output_schema=schema,
     )
     assert route.called
-    req_payload = json.loads(route.calls[-1].request.content)
+    req_payload = _sent_json(route)
     assert req_payload["instructions"] == "Find X"
     assert req_payload["model"] == "exa-research-pro"
     assert req_payload["output"]["schema"] == schema
     assert out["id"] == "task_123"
 
 
-@respx.mock
-async def test_exa_research_poll():
-    import server
-    route = respx.get(f"{server.EXA_RESEARCH_TASKS_ENDPOINT}/task_123").mock(
-        return_value=_json_response({"id": "task_123", "status": "complete", "data": {"ok": True}})
-    )
-    out = await server.exa_research_poll("task_123")
+async def test_exa_research_poll(exa_router):
+    route = exa_router["research_poll"].mock(return_value=_RESEARCH_POLL_RESP)
+    out = await _server.exa_research_poll("task_123")
     assert route.called
+    assert route.calls[-1].request.url == f"{_RESEARCH}/task_123"
     assert out["status"] == "complete"
     assert out["data"]["ok"] is True
 
 
-@respx.mock
-async def test_exa_fetch_subpages_with_target():
-    import server
-    route = respx.post(server.EXA_CONTENTS_ENDPOINT).mock(
-        return_value=_json_response(
-            {
-                "results": [
-                    {
-                        "title": "Root",
-                        "url": "https://root.com",
-                        "text": "ROOT",
-                        "subpages": [
-                            {"title": "About", "url": "https://root.com/about", "text": "ABOUT"},
-                            {"title": "News", "url": "https://root.com/news", "text": "NEWS"},
-                        ],
-                    }
-                ]
-            }
-        )
+async def test_repeated_search_is_served_from_cache(exa_router):
+    route = exa_router["search"].mock(return_value=_SEARCH_RESP)
+    first = await _server.exa_web_search("hello", num_results=2)
+    second = await _server.exa_web_search(query="hello", num_results=2)
+    assert route.call_count == 1
+    assert second == first
+
+
+async def test_livecrawl_always_bypasses_cache(exa_router):
+    route = exa_router["contents"].mock(return_value=_CONTENTS_BULK_RESP)
+    urls = ["https://1.com", "https://2.com"]
+    await _server.exa_fetch_contents(urls, livecrawl="always")
+    await _server.exa_fetch_contents(urls, livecrawl="always")
+    assert route.call_count == 2
+
+
+async def test_no_cache_fetches_fresh_results(exa_router):
+    route = exa_router["search"].mock(return_value=_SEARCH_RESP)
+    await _server.exa_web_search("hello", num_results=2)
+    await _server.exa_web_search("hello", num_results=2, no_cache=True)
+    await _server.exa_web_search("hello", num_results=2)
+    assert route.call_count == 2
+
+
+async def test_fetch_contents_only_requests_uncached_pages(exa_router):
+    route = exa_router["contents"].mock(return_value=_CONTENTS_SINGLE_RESP)
+    await _server.exa_fetch_content("https://x.com")
+    route.mock(return_value=_CONTENTS_BULK_RESP)
+    out = await _server.exa_fetch_contents(["https://x.com", "https://1.com", "https://2.com"])
+    assert route.call_count == 2
+    assert _sent_json(route)["urls"] == ["https://1.com", "https://2.com"]
+    assert [page.text for page in out] == ["CONTENT", "T1", "T2"]
+
+
+async def test_concurrent_identical_requests_share_one_call(exa_router):
+    route = exa_router["answer"].mock(return_value=_ANSWER_RESP)
+    first, second = await asyncio.gather(
+        _server.exa_answer_question("What is?"),
+        _server.exa_answer_question("What is?"),
+    )
+    assert route.call_count == 1
+    assert first == second
+
+
+async def test_concurrent_fetches_of_one_page_share_one_fetch(exa_router):
+    route = exa_router["contents"].mock(return_value=_CONTENTS_SINGLE_RESP)
+    first, second = await asyncio.gather(
+        _server.exa_fetch_content("https://x.com"),
+        _server.exa_fetch_content("https://x.com"),
+    )
+    assert route.call_count == 1
+    assert _sent_json(route)["urls"] == ["https://x.com"]
+    assert first is second
+
+
+async def test_concurrent_page_fetches_are_batched(exa_router):
+    route = exa_router["contents"].mock(return_value=_CONTENTS_BULK_RESP)
+    first, second = await asyncio.gather(
+        _server.exa_fetch_content("https://1.com"),
+        _server.exa_fetch_content("https://2.com"),
+    )
+    assert route.call_count == 1
+    assert _sent_json(route)["urls"] == ["https://1.com", "https://2.com"]
+    assert first.text == "T1"
+    assert second.text == "T2"
+
+
+async def test_batcher_requests_repeated_urls_once(exa_router):
+    route = exa_router["contents"].mock(return_value=_CONTENTS_SINGLE_RESP)
+    batcher = _server._content_batcher
+    first, second = await asyncio.gather(batcher.submit("https://x.com"), batcher.submit("https://x.com"))
+    assert route.call_count == 1
+    assert _sent_json(route)["urls"] == ["https://x.com"]
+    assert first is second
+
+
+def _reject_bulk_requests(request):
+    """Reject contents requests for several URLs; answer single pages."""
+    urls = json.loads(request.content)["urls"]
+    if len(urls) > 1:
+        return httpx.Response(400)
+    return httpx.Response(200, json={"results": [{"title": "P", "url": urls[0], "text": f"T {urls[0]}"}]})
+
+
+async def test_failed_batch_retries_each_url_once(exa_router):
+    route = exa_router["contents"].mock(side_effect=_reject_bulk_requests)
+    batcher = _server._content_batcher
+    pages = await asyncio.gather(
+        batcher.submit("https://1.com"), batcher.submit("https://1.com"), batcher.submit("https://2.com")
+    )
+    # One rejected batch, then one request per distinct URL
+    assert route.call_count == 3
+    assert [page.text for page in pages] == ["T https://1.com", "T https://1.com", "T https://2.com"]
+
+
+async def test_batch_retries_pages_returned_under_a_normalised_url(exa_router):
+    p1 = {"title": "P1", "url": "https://1.com/", "text": "T1"}
+    p2 = {"title": "P2", "url": "https://2.com", "text": "T2"}
+    route = exa_router["contents"].mock(
+        side_effect=[
+            httpx.Response(200, json={"results": [p1, p2]}),
+            httpx.Response(200, json={"results": [p1]}),
+        ]
     )
-    out = await server.exa_fetch_subpages(
-        url="https://root.com", subpages=3, subpage_target=["about", "news"], livecrawl="always"
+    out = await asyncio.gather(
+        _server.exa_fetch_content("https://1.com"),
+        _server.exa_fetch_content("https://2.com"),
     )
+    assert [page.text for page in out] == ["T1", "T2"]
+    assert route.call_count == 2
+    assert _sent_json(route)["urls"] == ["https://1.com"]
+
+
+async def test_search_fallback_does_not_rebatch_pages(exa_router):
+    exa_router["search"].mock(return_value=_SEARCH_RESP)
+    route = exa_router["contents"].mock(side_effect=_reject_bulk_requests)
+    results = await _server._search_with_text("hello", 2, include_text=True)
+    # The rejected bulk request, then each page on its own
+    assert route.call_count == 3
+    assert [len(json.loads(call.request.content)["urls"]) for call in route.calls] == [2, 1, 1]
+    assert [item.text for item in results] == ["T https://a.com", "T https://b.com"]
+
+
+async def test_search_fallback_bounds_requests_in_flight(exa_router, monkeypatch):
+    monkeypatch.setattr(_server, "EXA_FALLBACK_CONCURRENCY", 2)
+    urls = [f"https://{i}.com" for i in range(5)]
+    exa_router["search"].mock(
+        return_value=httpx.Response(200, json={"results": [{"title": str(i), "url": url} for i, url in enumerate(urls)]})
+    )
+    active = peak = 0
+
+    async def contents(request):
+        nonlocal active, peak
+        if len(json.loads(request.content)["urls"]) > 1:
+            return httpx.Response(400)
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _reject_bulk_requests(request)
+
+    route = exa_router["contents"].mock(side_effect=contents)
+    results = await _server._search_with_text("hello", 5, include_text=True)
+    assert [item.text for item in results] == [f"T {url}" for url in urls]
+    assert route.call_count == 6
+    assert peak == 2
+
+
+async def test_fetch_contents_keeps_pages_returned_under_a_normalised_url(exa_router):
+    # Exa normalises one URL, so only the other page matches a requested URL
+    p1 = {"title": "P1", "url": "https://1.com/", "text": "T1"}
+    p2 = {"title": "P2", "url": "https://2.com", "text": "T2"}
+    route = exa_router["contents"].mock(
+        side_effect=[
+            httpx.Response(200, json={"results": [p1, p2]}),
+            httpx.Response(200, json={"results": [p1]}),
+        ]
+    )
+    out = await _server.exa_fetch_contents(["https://1.com", "https://2.com"])
+    assert [page.text for page in out] == ["T2", "T1"]
+    # Only the matched page was cached, so the other one is requested again,
+    # alone this time, and matched by position
+    out = await _server.exa_fetch_contents(["https://1.com", "https://2.com"])
+    assert [page.text for page in out] == ["T1", "T2"]
+    assert route.call_count == 2
+    assert _sent_json(route)["urls"] == ["https://1.com"]
+
+
+async def test_fetch_pages_matches_by_position_when_no_url_matches(exa_router):
+    exa_router["contents"].mock(return_value=_CONTENTS_BULK_RESP)
+    pages, unmatched = await _server._fetch_pages(["https://1.com/", "https://2.com/"])
+    assert unmatched == []
+    assert {url: page.text for url, page in pages.items()} == {"https://1.com/": "T1", "https://2.com/": "T2"}
+
+
+async def test_shared_client_is_reused_until_closed():
+    client = await _server._get_client()
+    assert await _server._get_client() is client
+    await _server._close_client()
+    assert client.is_closed
+    assert await _server._get_client() is not client
+
+
+def test_helpers_work_across_event_loops(exa_router):
+    route = exa_router["search"].mock(return_value=_SEARCH_RESP)
+
+    async def search() -> httpx.AsyncClient:
+        assert len(await _server.exa_web_search("hello", no_cache=True)) == 2
+        return await _server._get_client()
+
+    # Each asyncio.run uses a new loop, whose connections the client from the
+    # previous loop cannot reuse
+    first, second = asyncio.run(search()), asyncio.run(search())
+    assert first is not second
+    assert route.call_count == 2
+
+
+async def test_prewarm_opens_client_and_ignores_errors(exa_router):
+    route = exa_router.get(_server.EXA_API_URL).mock(side_effect=httpx.ConnectError("down"))
+    await _server._prewarm()
     assert route.called
-    req_payload = json.loads(route.calls[-1].request.content)
-    assert req_payload["subpages"] == 3
-    assert req_payload["subpage_target"] == ["about", "news"]
-    assert req_payload["livecrawl"] == "always"
-    assert out["page"]["title"] == "Root"
-    assert len(out["subpages"]) == 2
+    assert _server._CLIENT is not None
+
+
+def _check_content_single(out, payload):
+    assert payload["urls"] == ["https://x.com"]
+    assert out.title == "Page"
+    assert out.text == "CONTENT"
+
+
+def _check_contents_bulk(out, payload):
+    assert payload["urls"] == ["https://1.com", "https://2.com"]
+    assert payload["text"] is True
+    assert payload["livecrawl"] == "preferred"
+    assert {d.url for d in out} == {"https://1.com", "https://2.com"}
+
+
+def _check_subpages_with_target(out, payload):
+    assert payload["subpages"] == 3
+    assert payload["subpage_target"] == ["about", "news"]
+    assert payload["livecrawl"] == "always"
+    assert out.page.title == "Root"
+    assert len(out.subpages) == 2
+
+
+@pytest.mark.parametrize(
+    "response, call, check",
+    [
+        pytest.param(
+            _CONTENTS_SINGLE_RESP,
+            lambda: _server.exa_fetch_content("https://x.com"),
+            _check_content_single,
+            id="fetch_content_single",
+        ),
+        pytest.param(
+            _CONTENTS_BULK_RESP,
+            lambda: _server.exa_fetch_contents(["https://1.com", "https://2.com"], livecrawl="preferred"),
+            _check_contents_bulk,
+            id="fetch_contents_bulk",
+        ),
+        pytest.param(
+            _SUBPAGES_RESP,
+            lambda: _server.exa_fetch_subpages(
+                url="https://root.com", subpages=3, subpage_target=["about", "news"], livecrawl="always"
+            ),
+            _check_subpages_with_target,
+            id="fetch_subpages_with_target",
+        ),
+    ],
+)
+async def test_exa_contents_endpoint(exa_router, response, call, check):
+    # All three helpers share the contents route; only the response differs
+    route = exa_router["contents"].mock(return_value=response)
+    out = await call()
+    assert route.called
+    check(out, _sent_json(route))
+
+
+async def test_requests_accept_compressed_responses(exa_router):
+    route = exa_router["answer"].mock(return_value=_ANSWER_RESP)
+    await _server.exa_answer_question("What is?")
+    assert "gzip" in route.calls[-1].request.headers["accept-encoding"]
+
+
+def test_dumps_indents_small_results_only(monkeypatch):
+    page = _server.Page(title="Page", url="https://x.com", text="CONTENT")
+    assert _server._dumps([page]).startswith("[\n  {")
+    monkeypatch.setattr(_server, "EXA_INDENT_MAX_BYTES", 10)
+    compact = _server._dumps([page])
+    assert "\n" not in compact
+    assert json.loads(compact) == [{"title": "Page", "url": "https://x.com", "text": "CONTENT"}]
+
+
+async def test_requests_use_short_connect_timeout(exa_router):
+    route = exa_router["search"].mock(return_value=_SEARCH_RESP)
+    await _server.exa_web_search("hello", num_results=2)
+    timeouts = route.calls[-1].request.extensions["timeout"]
+    assert timeouts["connect"] == _server.EXA_CONNECT_TIMEOUT
+    assert timeouts["read"] == 30
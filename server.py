@@ -14,36 +14,110 @@ To run the server you need an Exa API key which can be provided via the
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import functools
+import inspect
 import json
 import logging
 import os
-from collections.abc import AsyncIterator
+import random
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
 from typing import Any
 
 import click
+import fastjsonschema
 import httpx
 import mcp.types as types
+import msgspec
 from dotenv import load_dotenv
 from mcp.server.lowlevel import Server
 from mcp.server.sse import SseServerTransport
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from cachetools import FIFOCache, TTLCache
 from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.responses import Response
 from starlette.routing import Mount, Route
 from starlette.types import Receive, Scope, Send
 
-# Load environment variables from .env if present
-load_dotenv()
-
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Read configuration from environment variables
-EXA_MCP_SERVER_PORT = int(os.getenv("EXA_MCP_SERVER_PORT", "5000"))
-EXA_API_KEY = os.getenv("EXA_API_KEY", "")
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Server settings read from the environment.
+
+    Attributes:
+        api_key: The Exa API key (``EXA_API_KEY``).
+        port: The port the HTTP server binds to (``EXA_MCP_SERVER_PORT``).
+        json_response: Whether StreamableHTTP sends JSON responses instead of
+            SSE streams (``EXA_MCP_JSON_RESPONSE``).
+        debug: Whether Starlette runs in debug mode, returning tracebacks in
+            error responses (``EXA_MCP_DEBUG``).  Only for development.
+        cache_ttl: How long, in seconds, results of idempotent Exa calls are
+            cached (``EXA_CACHE_TTL``).  ``0`` disables caching.
+    """
+
+    api_key: str
+    port: int
+    json_response: bool
+    debug: bool
+    cache_ttl: int
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Load the server configuration, reading ``.env`` if present.
+
+    The configuration is read on first use rather than at import and then
+    cached.  Call ``get_config.cache_clear()`` to pick up changed settings,
+    such as a rotated API key, without restarting the process.
+    """
+    load_dotenv()
+    return Config(
+        api_key=os.getenv("EXA_API_KEY", ""),
+        port=int(os.getenv("EXA_MCP_SERVER_PORT", "5000")),
+        json_response=os.getenv("EXA_MCP_JSON_RESPONSE", "").lower() in ("1", "true", "yes"),
+        debug=os.getenv("EXA_MCP_DEBUG", "").lower() in ("1", "true", "yes"),
+        cache_ttl=int(os.getenv("EXA_CACHE_TTL", "300")),
+    )
+
+
+# Maximum number of cached results kept per helper
+EXA_CACHE_MAXSIZE = 1024
+# Concurrent single-page fetches are sent to Exa in one batch: a batch waits
+# at most this many seconds for more URLs, and is sent as soon as it holds
+# EXA_CONTENT_BATCH_SIZE of them.
+EXA_CONTENT_BATCH_LATENCY = 0.01
+EXA_CONTENT_BATCH_SIZE = 20
+# When a bulk contents request fails (for web search enrichment or a batch of
+# single-page fetches), pages are fetched one by one with at most this many
+# requests in flight
+EXA_FALLBACK_CONCURRENCY = 16
+# Transient Exa failures are retried with exponential backoff: at most
+# EXA_RETRY_ATTEMPTS attempts in total, waiting up to EXA_RETRY_BASE_DELAY *
+# 2**attempt seconds (with jitter, capped at EXA_RETRY_MAX_DELAY) in between.
+EXA_RETRY_ATTEMPTS = 4
+EXA_RETRY_BASE_DELAY = 0.5
+EXA_RETRY_MAX_DELAY = 30.0
+# Seconds allowed for opening a connection to Exa.  Kept short so an
+# unreachable host fails fast instead of stalling a tool call for the whole
+# request timeout.
+EXA_CONNECT_TIMEOUT = 5.0
+# Statuses that indicate a transient failure worth retrying
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Tool results whose compact JSON is larger than this many bytes are sent
+# without indentation
+EXA_INDENT_MAX_BYTES = 64 * 1024
+# HTTP responses smaller than this many bytes are sent uncompressed
+EXA_GZIP_MIN_BYTES = 1024
 
 # Exa endpoints
+EXA_API_URL = "https://api.exa.ai/"
 EXA_SEARCH_ENDPOINT = "https://api.exa.ai/search"
 EXA_CONTENTS_ENDPOINT = "https://api.exa.ai/contents"
 
@@ -56,7 +130,314 @@ EXA_ANSWER_ENDPOINT = "https://api.exa.ai/answer"
 EXA_RESEARCH_TASKS_ENDPOINT = "https://api.exa.ai/research/v0/tasks"
 
 
-async def exa_web_search(query: str, num_results: int = 3) -> list[dict[str, Any]]:
+# Result records returned by the helpers.  They are frozen msgspec structs:
+# cheaper to build than dicts, safe to share from the result caches, and
+# encoded straight to JSON by :func:`_dumps`.
+class SearchResult(msgspec.Struct, frozen=True):
+    """A web search hit returned by :func:`exa_web_search`."""
+
+    title: str | None = None
+    url: str | None = None
+    snippet: str = ""
+
+
+class SimilarLink(msgspec.Struct, frozen=True):
+    """A related page returned by :func:`exa_find_similar_links`."""
+
+    title: str | None = None
+    url: str | None = None
+    score: float | None = None
+    text: str | None = None
+
+
+class Page(msgspec.Struct, frozen=True):
+    """The extracted content of a page returned by the contents API."""
+
+    title: str | None = None
+    url: str | None = None
+    text: str | None = None
+
+
+class SubpageCrawl(msgspec.Struct, frozen=True):
+    """A root page and its crawled subpages, returned by :func:`exa_fetch_subpages`."""
+
+    page: Page
+    subpages: list[Page]
+
+
+# Shapes of the Exa responses we read.  Decoding straight into these skips
+# every field we do not use instead of building a dict for it.
+class _ExaResult(msgspec.Struct):
+    title: str | None = None
+    url: str | None = None
+    text: str | None = None
+    summary: str | None = None
+    score: float | None = None
+
+
+class _ExaResults(msgspec.Struct):
+    results: list[_ExaResult] = []
+
+
+class _ExaPages(msgspec.Struct):
+    results: list[Page] = []
+
+
+class _ExaCrawledPage(msgspec.Struct):
+    title: str | None = None
+    url: str | None = None
+    text: str | None = None
+    subpages: list[Page] = []
+
+
+class _ExaCrawl(msgspec.Struct):
+    results: list[_ExaCrawledPage] = []
+
+
+_JSON_DECODER = msgspec.json.Decoder()
+_RESULTS_DECODER = msgspec.json.Decoder(_ExaResults)
+_PAGES_DECODER = msgspec.json.Decoder(_ExaPages)
+_CRAWL_DECODER = msgspec.json.Decoder(_ExaCrawl)
+_JSON_ENCODER = msgspec.json.Encoder()
+
+# Shared HTTP client.  It is created lazily by :func:`_get_client` and reused
+# by every helper so that calls to Exa share pooled keep-alive connections
+# instead of paying a new TCP and TLS handshake per request.  All endpoints
+# live on one origin, so HTTP/2 lets concurrent calls multiplex over a few
+# connections rather than queueing behind each other.  The API key header is
+# set on the client once, so helpers do not build headers for every request.
+# Accept-Encoding is left to httpx: it advertises gzip and deflate, plus br
+# when the ``brotli`` package (pulled in by ``httpx[brotli]``) is installed,
+# and decodes compressed bodies transparently.
+_CLIENT: httpx.AsyncClient | None = None
+# The event loop _CLIENT was created on; its connections cannot be used from
+# another loop, e.g. after a second ``asyncio.run`` in the same process.
+_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client used for Exa requests, creating it on first use.
+
+    The server creates the client when it starts and closes it on shutdown.
+    Outside the server the client is created lazily, and created again when
+    called from a different event loop than the one it was created on.
+    """
+    global _CLIENT, _CLIENT_LOOP
+    api_key = get_config().api_key
+    loop = asyncio.get_running_loop()
+    if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+        # A client left over from a finished loop cannot be closed from this
+        # one; it is dropped together with its connections.
+        _CLIENT_LOOP = loop
+        _CLIENT = httpx.AsyncClient(
+            headers={"x-api-key": api_key, "Accept": "application/json"},
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=EXA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        )
+    elif _CLIENT.headers.get("x-api-key") != api_key:
+        # The key was rotated since the client was created
+        _CLIENT.headers["x-api-key"] = api_key
+    return _CLIENT
+
+
+async def _close_client() -> None:
+    """Close the shared HTTP client if it has been created."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+async def _prewarm() -> None:
+    """Open a connection to Exa before the first tool call needs one.
+
+    The response does not matter; the request only pays for DNS, TCP and TLS
+    up front so the connection is already pooled when the first tool call
+    arrives.  Failures are logged and otherwise ignored.
+    """
+    client = await _get_client()
+    try:
+        await client.get(EXA_API_URL, timeout=5)
+    except httpx.HTTPError as e:
+        logger.debug("Prewarming the Exa connection failed: %s", e)
+
+
+def _dumps(obj: Any) -> str:
+    """Serialise a tool result, including result structs, to JSON text.
+
+    Results are indented for readability unless their compact encoding is
+    larger than ``EXA_INDENT_MAX_BYTES``; for bulk page text, indentation
+    only adds bytes for the client to receive and parse.
+    """
+    encoded = _JSON_ENCODER.encode(obj)
+    if len(encoded) <= EXA_INDENT_MAX_BYTES:
+        encoded = msgspec.json.format(encoded, indent=2)
+    return encoded.decode("utf-8")
+
+
+# Requests and helper calls currently in flight, keyed by what they fetch
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+async def _single_flight(key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Share one in-flight call between concurrent callers using the same key.
+
+    The first caller starts ``coro_factory()`` as a task; callers that
+    arrive with the same key while it is running await that task instead of
+    starting their own.  The task is shielded so a cancelled caller does not
+    cancel the request for everyone else.
+    """
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _INFLIGHT[key] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if _INFLIGHT.get(key) is done:
+                del _INFLIGHT[key]
+
+        task.add_done_callback(_forget)
+    return await asyncio.shield(task)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Return how long to wait before retrying after ``response``.
+
+    ``Retry-After`` is honoured when Exa sends it in seconds; otherwise the
+    delay backs off exponentially with full jitter.  Either way it is capped
+    at ``EXA_RETRY_MAX_DELAY``.
+    """
+    retry_after = response.headers.get("retry-after")
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), EXA_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(EXA_RETRY_BASE_DELAY * 2**attempt, EXA_RETRY_MAX_DELAY))
+
+
+async def _request(
+    method: str,
+    url: str,
+    *,
+    timeout: float,
+    payload: dict[str, Any] | None = None,
+    decoder: msgspec.json.Decoder = _JSON_DECODER,
+    idempotent: bool = True,
+) -> Any:
+    """Send a request to Exa and return the JSON body decoded with ``decoder``.
+
+    Identical concurrent requests are coalesced into a single upstream call,
+    and transient failures (429, 502, 503 and 504) are retried up to
+    ``EXA_RETRY_ATTEMPTS`` times in total.  Pass ``idempotent=False`` for
+    requests that must not be repeated: they are never coalesced and are
+    only retried on 429, which Exa returns before doing any work.
+
+    Raises:
+        httpx.HTTPStatusError: If Exa responds with a non-2xx status that is
+            not retryable, or still fails after the last attempt.
+        msgspec.ValidationError: If the body does not match ``decoder``'s type.
+    """
+    retry_statuses = _RETRY_STATUSES if idempotent else frozenset({429})
+
+    async def send() -> Any:
+        client = await _get_client()
+        for attempt in range(EXA_RETRY_ATTEMPTS):
+            response = await client.request(
+                method, url, json=payload, timeout=httpx.Timeout(timeout, connect=EXA_CONNECT_TIMEOUT)
+            )
+            logger.debug(
+                "%s %s answered over %s (content-encoding: %s)",
+                method,
+                url,
+                response.http_version,
+                response.headers.get("content-encoding", "identity"),
+            )
+            if response.status_code not in retry_statuses or attempt == EXA_RETRY_ATTEMPTS - 1:
+                break
+            delay = _retry_delay(response, attempt)
+            logger.warning(
+                "%s %s returned %s, retrying in %.2fs", method, url, response.status_code, delay
+            )
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        return decoder.decode(response.content)
+
+    if not idempotent:
+        return await send()
+    key = f"{method} {url} {json.dumps(payload, sort_keys=True)}"
+    return await _single_flight(key, send)
+
+
+# Result caches, keyed by name; see :func:`_cache`
+_CACHES: dict[str, TTLCache] = {}
+# Name of the cache holding single pages, shared by the contents helpers
+_PAGE_CACHE = "pages"
+
+
+def _cache(name: str) -> TTLCache | None:
+    """Return the result cache called ``name``, or ``None`` if caching is off.
+
+    Caches are created on first use, so their TTL comes from
+    :func:`get_config` rather than from the environment at import time.
+    Cached values are shared between callers and must not be mutated.
+    """
+    ttl = get_config().cache_ttl
+    if ttl <= 0:
+        return None
+    cache = _CACHES.get(name)
+    if cache is None:
+        cache = _CACHES[name] = TTLCache(maxsize=EXA_CACHE_MAXSIZE, ttl=ttl)
+    return cache
+
+
+def _cached(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Cache the results of an idempotent Exa helper for ``EXA_CACHE_TTL`` seconds.
+
+    Agents frequently repeat the same search or fetch within a short time, so
+    identical calls are answered from memory instead of going back to Exa.
+    The cache key is built from the bound arguments, so positional and
+    keyword calls share entries.  Exceptions are never cached, and calls
+    that explicitly ask for a fresh crawl (``livecrawl="always"``) bypass
+    the cache.  The wrapper also accepts ``no_cache=True``, which skips the
+    lookup and replaces any cached result with the fresh one.  Identical
+    calls that miss the cache while the helper is already running for the
+    same arguments wait for that run instead of starting another.
+    """
+    signature = inspect.signature(fn)
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, no_cache: bool = False, **kwargs: Any) -> Any:
+        cache = _cache(name)
+        if cache is None:
+            return await fn(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        if bound.arguments.get("livecrawl") == "always":
+            return await fn(*args, **kwargs)
+        key = json.dumps(bound.arguments, sort_keys=True)
+        if not no_cache:
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+        # Concurrent identical calls share one run of the helper
+        result = await _single_flight(f"{name} {key}", lambda: fn(*args, **kwargs))
+        cache[key] = result
+        return result
+
+    return wrapper
+
+
+def _clear_caches() -> None:
+    """Drop every cached Exa result."""
+    _CACHES.clear()
+
+
+@_cached
+async def exa_web_search(query: str, num_results: int = 3) -> list[SearchResult]:
     """Perform a web search using the Exa API.
 
     Args:
@@ -64,45 +445,37 @@ async def exa_web_search(query: str, num_results: int = 3) -> list[dict[str, Any
         num_results: The maximum number of results to return.  Defaults to 3.
 
     Returns:
-        A list of dictionaries each containing ``title``, ``url`` and ``snippet``
-        keys.  If the Exa API returns fewer results than requested, the list
-        will contain fewer items.
+        A list of :class:`SearchResult` records with ``title``, ``url`` and
+        ``snippet`` fields.  If the Exa API returns fewer results than
+        requested, the list will contain fewer items.
 
     Raises:
         Exception: If the API key is missing or if the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY}
     payload = {
         "query": query,
-        "num_results": num_results,
+        "numResults": num_results,
         "text": False,
     }
-    logger.debug(f"Sending search request to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(EXA_SEARCH_ENDPOINT, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    results: list[dict[str, Any]] = []
-    for item in data.get("results", [])[: num_results]:
-        results.append(
-            {
-                "title": item.get("title"),
-                "url": item.get("url"),
-                # Fall back to summary if text isn't present
-                "snippet": item.get("text") or item.get("summary") or "",
-            }
-        )
-    logger.debug(f"Search results: {results}")
+    logger.debug("Sending search request to Exa: %s", payload)
+    data = await _request("POST", EXA_SEARCH_ENDPOINT, payload=payload, timeout=30, decoder=_RESULTS_DECODER)
+    results = [
+        # Fall back to summary if text isn't present
+        SearchResult(title=item.title, url=item.url, snippet=item.text or item.summary or "")
+        for item in data.results
+    ]
+    logger.debug("Search results: %s", results)
     return results
 
 
+@_cached
 async def exa_find_similar_links(
     url: str,
     include_text: bool = False,
     num_results: int = 3,
-) -> list[dict[str, Any]]:
+) -> list[SimilarLink]:
     """Find and return links similar in meaning to the provided URL.
 
     This function calls Exa's ``findSimilar`` endpoint to retrieve links
@@ -115,37 +488,33 @@ async def exa_find_similar_links(
         num_results: The maximum number of similar results to return.
 
     Returns:
-        A list of dictionaries each containing at least ``title``, ``url``,
-        and ``score``. If ``include_text`` is set, the ``text`` field will
+        A list of :class:`SimilarLink` records with ``title``, ``url`` and
+        ``score`` fields. If ``include_text`` is set, the ``text`` field will
         contain the extracted content of each similar page.
 
     Raises:
         Exception: If the API key is missing or the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY}
-    payload: dict[str, Any] = {"url": url, "text": include_text}
-    logger.debug(f"Sending findSimilar request to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(EXA_FIND_SIMILAR_ENDPOINT, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    results: list[dict[str, Any]] = []
-    for item in data.get("results", [])[: num_results]:
-        # Only include the full text when requested.  Use summary as a fallback.
-        results.append(
-            {
-                "title": item.get("title"),
-                "url": item.get("url"),
-                "score": item.get("score"),
-                "text": (item.get("text") or item.get("summary") or "") if include_text else None,
-            }
+    payload: dict[str, Any] = {"url": url, "numResults": num_results, "text": include_text}
+    logger.debug("Sending findSimilar request to Exa: %s", payload)
+    data = await _request("POST", EXA_FIND_SIMILAR_ENDPOINT, payload=payload, timeout=30, decoder=_RESULTS_DECODER)
+    # Only include the full text when requested.  Use summary as a fallback.
+    results = [
+        SimilarLink(
+            title=item.title,
+            url=item.url,
+            score=item.score,
+            text=(item.text or item.summary or "") if include_text else None,
         )
-    logger.debug(f"findSimilar results: {results}")
+        for item in data.results
+    ]
+    logger.debug("findSimilar results: %s", results)
     return results
 
 
+@_cached
 async def exa_answer_question(
     query: str,
     include_text: bool = False,
@@ -167,16 +536,12 @@ async def exa_answer_question(
     Raises:
         Exception: If the API key is missing or the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY}
     payload: dict[str, Any] = {"query": query, "text": include_text}
-    logger.debug(f"Sending answer request to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(EXA_ANSWER_ENDPOINT, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    logger.debug(f"Answer result: {data}")
+    logger.debug("Sending answer request to Exa: %s", payload)
+    data = await _request("POST", EXA_ANSWER_ENDPOINT, payload=payload, timeout=30)
+    logger.debug("Answer result: %s", data)
     return data
 
 
@@ -210,20 +575,24 @@ async def exa_research_start(
     Raises:
         Exception: If the API key is missing or the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY, "Content-Type": "application/json"}
     payload: dict[str, Any] = {"instructions": instructions}
     if model:
         payload["model"] = model
     if output_schema:
         payload["output"] = {"schema": output_schema}
-    logger.debug(f"Sending research task creation to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(EXA_RESEARCH_TASKS_ENDPOINT, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    logger.debug(f"Research task created: {data}")
+    logger.debug("Sending research task creation to Exa: %s", payload)
+    # Creating a task is not idempotent, so identical requests are never
+    # coalesced and failures that may have created a task are not retried
+    data = await _request(
+        "POST",
+        EXA_RESEARCH_TASKS_ENDPOINT,
+        payload=payload,
+        timeout=30,
+        idempotent=False,
+    )
+    logger.debug("Research task created: %s", data)
     return data
 
 
@@ -241,72 +610,63 @@ async def exa_research_poll(task_id: str) -> dict[str, Any]:
     Raises:
         Exception: If the API key is missing or the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY}
     # Compose the URL with the task ID
     url = f"{EXA_RESEARCH_TASKS_ENDPOINT}/{task_id}"
-    logger.debug(f"Polling research task {task_id}")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    logger.debug(f"Research task status: {data}")
+    logger.debug("Polling research task %s", task_id)
+    data = await _request("GET", url, timeout=30)
+    logger.debug("Research task status: %s", data)
     return data
 
 
-async def exa_fetch_content(url: str) -> dict[str, Any]:
+async def exa_fetch_content(url: str, no_cache: bool = False) -> Page:
     """Retrieve the full text content of a given URL using Exa's contents API.
 
+    Concurrent single-page fetches are grouped by :class:`_ContentBatcher`
+    into one bulk contents request, so an agent reading several pages in
+    parallel costs a single round trip.  Pages are cached per URL, shared
+    with :func:`exa_fetch_contents`.
+
     Args:
         url: The URL of the page to fetch.
+        no_cache: If ``True``, fetch the page from Exa even if it is cached.
 
     Returns:
-        A dictionary with keys ``title``, ``url`` and ``text`` containing the
-        extracted content of the page.
+        A :class:`Page` with the ``title``, ``url`` and extracted ``text`` of
+        the page.
 
     Raises:
         Exception: If the API key is missing or if the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY}
-    payload = {
-        "urls": [url],
-        "text": True,
-    }
-    logger.debug(f"Sending contents request to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(EXA_CONTENTS_ENDPOINT, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    results = data.get("results", [])
-    if not results:
-        raise Exception("No content returned from Exa for the given URL")
-    result = results[0]
-    content: dict[str, Any] = {
-        "title": result.get("title"),
-        "url": result.get("url"),
-        "text": result.get("text"),
-    }
-    logger.debug(f"Content result: {content}")
+    cache = None if no_cache else _cache(_PAGE_CACHE)
+    content = cache.get((url, None)) if cache is not None else None
+    if content is None:
+        content = await _single_flight(f"page {url}", lambda: _content_batcher.submit(url))
+    logger.debug("Content result: %s", content)
     return content
 
 
 async def exa_fetch_contents(
     urls: list[str],
     livecrawl: str | None = None,
-) -> list[dict[str, Any]]:
+    no_cache: bool = False,
+) -> list[Page]:
     """Retrieve the full text content for multiple URLs using Exa's contents API.
 
     This helper function accepts a list of URLs and returns a list of
-    dictionaries containing the title, URL and text of each page.  It is
+    :class:`Page` records containing the title, URL and text of each page.  It is
     intended for internal use when enriching search results, but is also
     exposed as an atomic tool via the MCP `exa_fetch_contents` tool.  You
     can optionally request that Exa fetch the live version of each page
     instead of its cached copy by setting ``livecrawl`` to ``"always"``,
     ``"preferred"`` or ``"never"``.
 
+    Pages are cached per URL, so a request that overlaps an earlier one only
+    asks Exa for the pages it has not already fetched.
+
     Args:
         urls: A list of URLs to fetch.  Must be non‑empty.
         livecrawl: Optional string controlling how Exa fetches the content.
@@ -314,53 +674,193 @@ async def exa_fetch_contents(
             fresh crawl but falls back to cache on failure, and ``"never"``
             uses only cached results.  When ``None`` the default behaviour
             is used.
+        no_cache: If ``True``, fetch every page from Exa even if it is
+            cached.
 
     Returns:
-        A list of dictionaries, one per URL, with keys ``title``, ``url``
-        and ``text`` representing the extracted page content.  If a page
-        cannot be fetched, it will simply be omitted from the result list.
+        A list of :class:`Page` records, one per distinct URL in request
+        order, with ``title``, ``url`` and ``text`` fields representing the
+        extracted page content.  Pages Exa returned under a normalised URL
+        follow at the end.  If a page cannot be fetched, it will simply be
+        omitted from the result list.
 
     Raises:
         Exception: If the API key is missing, if ``urls`` is empty, or if the
             HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
     if not urls:
         raise Exception("Argument 'urls' must be a non‑empty list of URLs")
-    headers = {"x-api-key": EXA_API_KEY}
+    urls = list(dict.fromkeys(urls))
+    # A fresh crawl is never answered from, or stored in, the page cache
+    cache = None if livecrawl == "always" else _cache(_PAGE_CACHE)
+    pages: dict[str, Page] = {}
+    if cache is not None and not no_cache:
+        for url in urls:
+            page = cache.get((url, livecrawl))
+            if page is not None:
+                pages[url] = page
+    misses = [url for url in urls if url not in pages]
+    unmatched: list[Page] = []
+    if misses:
+        fetched, unmatched = await _fetch_pages(misses, livecrawl)
+        pages.update(fetched)
+        if cache is not None:
+            for url, page in fetched.items():
+                cache[(url, livecrawl)] = page
+    # Pages Exa returned under a URL we did not ask for are kept, uncached
+    results = [pages[url] for url in urls if url in pages] + unmatched
+    logger.debug("Bulk content results: %s", results)
+    return results
+
+
+async def _fetch_pages(
+    urls: list[str], livecrawl: str | None = None
+) -> tuple[dict[str, Page], list[Page]]:
+    """Fetch ``urls`` in one contents request.
+
+    Returns the pages matched to a requested URL, keyed by that URL, and the
+    pages Exa returned under a URL that matched none of them (Exa may
+    normalise URLs, e.g. by adding a trailing slash).  Only matched pages are
+    safe to cache by URL.
+    """
     payload: dict[str, Any] = {"urls": urls, "text": True}
     if livecrawl:
         payload["livecrawl"] = livecrawl
-    logger.debug(f"Sending bulk contents request to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            EXA_CONTENTS_ENDPOINT,
-            json=payload,
-            headers=headers,
-            timeout=60,
-        )
-        response.raise_for_status()
-        data = response.json()
-    results: list[dict[str, Any]] = []
-    for item in data.get("results", []):
-        results.append(
-            {
-                "title": item.get("title"),
-                "url": item.get("url"),
-                "text": item.get("text"),
-            }
-        )
-    logger.debug(f"Bulk content results: {results}")
-    return results
+    logger.debug("Sending bulk contents request to Exa: %s", payload)
+    data = await _request("POST", EXA_CONTENTS_ENDPOINT, payload=payload, timeout=60, decoder=_PAGES_DECODER)
+    by_url = {page.url: page for page in data.results}
+    pages = {url: by_url[url] for url in urls if url in by_url}
+    if not pages and len(data.results) == len(urls):
+        # Exa normalised every URL, so none matched; results keep the request
+        # order.  Position is never used once any URL matched, since a page
+        # paired with the wrong URL would be cached under it.
+        pages = dict(zip(urls, data.results))
+    matched = {id(page) for page in pages.values()}
+    return pages, [page for page in data.results if id(page) not in matched]
+
+
+async def _fetch_page(url: str) -> Page:
+    """Fetch ``url`` in a contents request of its own and store it in the page cache.
+
+    Unlike :func:`exa_fetch_content` this never goes through the batcher, so
+    it is used to retry pages one by one after a bulk request failed.
+    """
+    pages, _ = await _fetch_pages([url])
+    page = pages.get(url)
+    if page is None:
+        raise Exception("No content returned from Exa for the given URL")
+    cache = _cache(_PAGE_CACHE)
+    if cache is not None:
+        cache[(url, None)] = page
+    return page
 
 
+async def _fetch_each(urls: list[str]) -> list[Page | BaseException]:
+    """Fetch ``urls`` one page per request, at most EXA_FALLBACK_CONCURRENCY at a time.
+
+    Returns the page, or the exception raised fetching it, for each URL.
+    """
+    semaphore = asyncio.Semaphore(EXA_FALLBACK_CONCURRENCY)
+
+    async def fetch(url: str) -> Page:
+        async with semaphore:
+            return await _fetch_page(url)
+
+    return await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+
+
+class _ContentBatcher:
+    """Group concurrent single-page fetches into bulk contents requests.
+
+    URLs submitted within ``max_latency`` seconds of each other are sent to
+    Exa as one contents request, and each caller receives the page matching
+    its URL, which is also stored in the page cache.  A batch is sent early once it holds
+    ``max_size`` URLs.  If a multi-page batch fails, its pages are retried
+    one by one, at most ``EXA_FALLBACK_CONCURRENCY`` at a time, so a single
+    bad URL does not fail the others; so are pages Exa returned no match for.
+    """
+
+    def __init__(self, max_size: int, max_latency: float) -> None:
+        self._max_size = max_size
+        self._max_latency = max_latency
+        self._queue: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # Strong references to running batches so they are not garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, url: str) -> asyncio.Future:
+        """Queue ``url`` for the next batch and return a future for its content."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((url, future))
+        if len(self._queue) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_latency, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        # A URL queued by several callers is only requested once
+        urls = list(dict.fromkeys(url for url, _ in batch))
+        results: dict[str, Page | BaseException]
+        try:
+            pages, _ = await _fetch_pages(urls)
+        except Exception as exc:
+            if len(urls) == 1:
+                results = {urls[0]: exc}
+            else:
+                results = dict(zip(urls, await _fetch_each(urls)))
+        else:
+            cache = _cache(_PAGE_CACHE)
+            if cache is not None:
+                for url, page in pages.items():
+                    cache[(url, None)] = page
+            results = dict(pages)
+            # Exa may return a page under a normalised URL we cannot match;
+            # retry those alone, where a single page is matched by position
+            unmatched = [url for url in urls if url not in pages]
+            if len(urls) > 1:
+                results.update(zip(unmatched, await _fetch_each(unmatched)))
+            for url in unmatched:
+                results.setdefault(
+                    url, Exception("No content returned from Exa for the given URL")
+                )
+        for url, future in batch:
+            if future.done():
+                # The caller was cancelled while the batch was in flight
+                continue
+            content = results[url]
+            if isinstance(content, BaseException):
+                future.set_exception(content)
+            else:
+                future.set_result(content)
+
+
+_content_batcher = _ContentBatcher(
+    max_size=EXA_CONTENT_BATCH_SIZE,
+    max_latency=EXA_CONTENT_BATCH_LATENCY,
+)
+
+
+@_cached
 async def exa_fetch_subpages(
     url: str,
     subpages: int = 5,
     subpage_target: list[str] | None = None,
     livecrawl: str | None = None,
-) -> dict[str, Any]:
+) -> SubpageCrawl:
     """Retrieve the content of a page and its subpages using Exa's subpage crawling feature.
 
     Exa can automatically discover and crawl linked pages within a website.  This
@@ -379,18 +879,17 @@ async def exa_fetch_subpages(
             content.  Accepts the same values as :func:`exa_fetch_contents`.
 
     Returns:
-        A dictionary with two keys:
-            ``page`` – a dictionary containing the title, URL and text of the
-                root page; and
-            ``subpages`` – a list of dictionaries for each discovered subpage
-                containing title, URL and text.
+        A :class:`SubpageCrawl` with two fields:
+            ``page`` – a :class:`Page` containing the title, URL and text of
+                the root page; and
+            ``subpages`` – a list of :class:`Page` records for each
+                discovered subpage.
 
     Raises:
         Exception: If the API key is missing or the HTTP request fails.
     """
-    if not EXA_API_KEY:
+    if not get_config().api_key:
         raise Exception("EXA_API_KEY environment variable is not set")
-    headers = {"x-api-key": EXA_API_KEY}
     payload: dict[str, Any] = {
         "urls": [url],
         "text": True,
@@ -400,817 +899,487 @@ async def exa_fetch_subpages(
         payload["subpage_target"] = subpage_target
     if livecrawl:
         payload["livecrawl"] = livecrawl
-    logger.debug(f"Sending subpage crawl request to Exa: {payload}")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            EXA_CONTENTS_ENDPOINT,
-            json=payload,
-            headers=headers,
-            timeout=60,
-        )
-        response.raise_for_status()
-        data = response.json()
-    results = data.get("results", [])
-    if not results:
+    logger.debug("Sending subpage crawl request to Exa: %s", payload)
+    data = await _request("POST", EXA_CONTENTS_ENDPOINT, payload=payload, timeout=60, decoder=_CRAWL_DECODER)
+    if not data.results:
         raise Exception("No content returned from Exa for the given URL")
-    result = results[0]
-    page = {
-        "title": result.get("title"),
-        "url": result.get("url"),
-        "text": result.get("text"),
-    }
-    subpages_results = []
-    for sub in result.get("subpages", []):
-        subpages_results.append(
-            {
-                "title": sub.get("title"),
-                "url": sub.get("url"),
-                "text": sub.get("text"),
+    result = data.results[0]
+    page = Page(title=result.title, url=result.url, text=result.text)
+    logger.debug("Subpages results: %s", result.subpages)
+    return SubpageCrawl(page=page, subpages=result.subpages)
+
+
+# Schema of the ``no_cache`` argument accepted by tools whose results are cached
+_NO_CACHE_PROPERTY = {
+    "no_cache": {
+        "type": "boolean",
+        "description": "Skip cached results and fetch fresh data from Exa.",
+        "default": False,
+    },
+}
+
+# Tool definitions advertised by ``list_tools``.  They never change, so they
+# are built once at import and kept in a tuple so no handler can modify them.
+# Serialising them for ``tools/list`` is left to the MCP server, which owns the
+# wire encoding and offers no hook for emitting pre-encoded bytes.
+_TOOLS: tuple[types.Tool, ...] = (
+    # Search tool
+    types.Tool(
+        name="exa_web_search",
+        description=(
+            "Perform a real-time web search via Exa and return a list of "
+            "results with title, url, and snippet fields. Optionally "
+            "include full text in each result."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The search query.",
+                    "minLength": 1,
+                },
+                "num_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return",
+                    "minimum": 1,
+                    "default": 3,
+                },
+                "include_text": {
+                    "type": "boolean",
+                    "description": "Whether to include full page text in each search result",
+                    "default": False,
+                },
+                **_NO_CACHE_PROPERTY,
+            },
+            "required": ["query"],
+        },
+    ),
+    # Content retrieval tool
+    types.Tool(
+        name="exa_fetch_content",
+        description=(
+            "Retrieve and read the full text content of a given URL using "
+            "Exa's content retrieval API. Use after obtaining a URL from "
+            "exa_web_search or other means."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL of the page to fetch.",
+                    "minLength": 1,
+                },
+                **_NO_CACHE_PROPERTY,
+            },
+            "required": ["url"],
+        },
+    ),
+    # Bulk content retrieval tool
+    types.Tool(
+        name="exa_fetch_contents",
+        description=(
+            "Retrieve the full text contents of multiple URLs in one call via Exa's "
+            "contents API. Provide a list of URLs and optionally specify the "
+            "livecrawl mode to control whether Exa should fetch fresh pages."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "urls": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "A list of URLs to fetch. Must contain at least one URL.",
+                    "minItems": 1,
+                },
+                "livecrawl": {
+                    "type": "string",
+                    "description": "Optional livecrawl mode: 'always', 'preferred', or 'never'.",
+                    "enum": ["always", "preferred", "never"],
+                },
+                **_NO_CACHE_PROPERTY,
+            },
+            "required": ["urls"],
+        },
+    ),
+    # Subpage crawling tool
+    types.Tool(
+        name="exa_fetch_subpages",
+        description=(
+            "Crawl a website and retrieve the contents of the root page and a number of "
+            "its subpages. Use this when you need to explore beyond the main page, "
+            "such as fetching 'about' or 'products' pages on a company site."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The root URL from which to crawl subpages.",
+                    "minLength": 1,
+                },
+                "subpages": {
+                    "type": "integer",
+                    "description": "Maximum number of subpages to crawl.",
+                    "minimum": 1,
+                    "default": 5,
+                },
+                "subpage_target": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional keywords used to prioritise which subpages to fetch.",
+                },
+                "livecrawl": {
+                    "type": "string",
+                    "description": "Optional livecrawl mode: 'always', 'preferred', or 'never'.",
+                    "enum": ["always", "preferred", "never"],
+                },
+                **_NO_CACHE_PROPERTY,
+            },
+            "required": ["url"],
+        },
+    ),
+    # Find similar links tool
+    types.Tool(
+        name="exa_find_similar_links",
+        description=(
+            "Given a URL, return a list of links with similar meaning "
+            "using Exa's findSimilar API. Useful for discovering related "
+            "articles or pages."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to find similar links for.",
+                    "minLength": 1,
+                },
+                "include_text": {
+                    "type": "boolean",
+                    "description": "Whether to include the text of each similar page in the response.",
+                    "default": False,
+                },
+                "num_results": {
+                    "type": "integer",
+                    "description": "Maximum number of similar results to return",
+                    "minimum": 1,
+                    "default": 3,
+                },
+                **_NO_CACHE_PROPERTY,
+            },
+            "required": ["url"],
+        },
+    ),
+    # Answer question tool
+    types.Tool(
+        name="exa_answer_question",
+        description=(
+            "Ask a natural-language question and get a direct answer using "
+            "Exa's Answer API. Returns both the answer and supporting "
+            "citations."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The question to answer.",
+                    "minLength": 1,
+                },
+                "include_text": {
+                    "type": "boolean",
+                    "description": "Whether to include full text of supporting sources in the response.",
+                    "default": False,
+                },
+                **_NO_CACHE_PROPERTY,
+            },
+            "required": ["query"],
+        },
+    ),
+    # Research start tool
+    types.Tool(
+        name="exa_research_start",
+        description=(
+            "Start an asynchronous research task that uses Exa's "
+            "agentic pipeline to search, reason, and synthesize an answer. "
+            "Returns a task ID which you can poll to retrieve results."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "instructions": {
+                    "type": "string",
+                    "description": "Natural-language instructions describing the research task.",
+                    "minLength": 1,
+                },
+                "model": {
+                    "type": "string",
+                    "description": "Optional model to use for research (e.g. 'exa-research' or 'exa-research-pro').",
+                },
+                "output_schema": {
+                    "type": "object",
+                    "description": "Optional JSON Schema specifying the desired structured output.",
+                },
+            },
+            "required": ["instructions"],
+        },
+    ),
+    # Research poll tool
+    types.Tool(
+        name="exa_research_poll",
+        description=(
+            "Poll a previously created research task to check its status and "
+            "retrieve results once complete."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "task_id": {
+                    "type": "string",
+                    "description": "The ID of the research task returned by exa_research_start.",
+                    "minLength": 1,
+                }
+            },
+            "required": ["task_id"],
+        },
+    ),
+)
+
+
+async def _search_with_text(
+    query: str,
+    num_results: int,
+    include_text: bool,
+    no_cache: bool = False,
+) -> list[SearchResult | Page]:
+    """Run a web search, optionally enriching results with full page text.
+
+    If ``include_text`` is requested, the search results are enriched by
+    calling the contents API in bulk, falling back to per-page requests on
+    failure.  ``no_cache`` applies to the search and to every page fetch.
+    """
+    results: list[SearchResult | Page] = await exa_web_search(
+        query=query, num_results=num_results, no_cache=no_cache
+    )
+    # Search can return the same URL more than once; fetch each page once and
+    # reuse it for every matching result.
+    urls = list(dict.fromkeys(item.url for item in results if item.url))
+    if include_text and urls:
+        try:
+            contents = await exa_fetch_contents(urls=urls, no_cache=no_cache)
+            url_to_content = {item.url: item for item in contents}
+            # ``results`` may be the list held in the search cache, so build
+            # a new list instead of writing pages back into it.  Pages Exa
+            # could not fetch are omitted from ``contents``, so it cannot be
+            # matched to ``results`` by position either.
+            results = [url_to_content.get(item.url, item) for item in results]
+        except Exception:
+            # Fetch each page on its own, bypassing the batcher, which would
+            # only merge them back into the bulk request that just failed.
+            # Results whose page failed, or that have no URL, are kept as is.
+            fetched = await _fetch_each(urls)
+            url_to_content = {
+                url: content
+                for url, content in zip(urls, fetched)
+                if not isinstance(content, BaseException)
             }
-        )
-    logger.debug(f"Subpages results: {subpages_results}")
-    return {"page": page, "subpages": subpages_results}
+            results = [url_to_content.get(item.url, item) for item in results]
+    return results
+
+
+@dataclass(frozen=True, slots=True)
+class _ToolSpec:
+    """The coroutine implementing a tool and the names of the arguments it accepts.
+
+    Presence, types and defaults are all declared by the tool's
+    ``inputSchema``; its validator fills in the defaults, so they are not
+    repeated here.
+    """
+
+    fn: Callable[..., Awaitable[Any]]
+    args: tuple[str, ...]
+
+    def parse(self, arguments: dict) -> dict[str, Any]:
+        """Map validated arguments onto keyword arguments for ``fn``.
+
+        Optional arguments without a schema default that the client omitted
+        are left to ``fn``'s own defaults.
+        """
+        return {name: arguments[name] for name in self.args if name in arguments}
+
+
+# Tool name -> spec used by ``call_tool``.  Arguments are checked against the
+# tool's ``inputSchema``, which also supplies their defaults, before they are
+# parsed.
+_TOOL_SPECS: dict[str, _ToolSpec] = {
+    "exa_web_search": _ToolSpec(
+        _search_with_text,
+        ("query", "num_results", "include_text", "no_cache"),
+    ),
+    "exa_fetch_content": _ToolSpec(exa_fetch_content, ("url", "no_cache")),
+    "exa_find_similar_links": _ToolSpec(
+        exa_find_similar_links,
+        ("url", "include_text", "num_results", "no_cache"),
+    ),
+    "exa_fetch_contents": _ToolSpec(exa_fetch_contents, ("urls", "livecrawl", "no_cache")),
+    "exa_fetch_subpages": _ToolSpec(
+        exa_fetch_subpages,
+        ("url", "subpages", "subpage_target", "livecrawl", "no_cache"),
+    ),
+    "exa_answer_question": _ToolSpec(
+        exa_answer_question,
+        ("query", "include_text", "no_cache"),
+    ),
+    "exa_research_start": _ToolSpec(
+        exa_research_start,
+        ("instructions", "model", "output_schema"),
+    ),
+    "exa_research_poll": _ToolSpec(exa_research_poll, ("task_id",)),
+}
+
+# Validators compiled once from each tool's ``inputSchema``.  They return the
+# arguments with the schema's defaults filled in, or raise
+# ``fastjsonschema.JsonSchemaValueException`` (a ``ValueError``) describing
+# the first invalid argument.
+_VALIDATORS: dict[str, Callable[[dict], Any]] = {
+    tool.name: fastjsonschema.compile(tool.inputSchema) for tool in _TOOLS
+}
+
+
+def _text_content(text: str) -> list[types.TextContent]:
+    """Wrap ``text`` as the content returned by ``call_tool``.
+
+    ``model_construct`` skips pydantic validation; ``text`` is always a
+    ``str`` here, so there is nothing to validate.
+    """
+    return [types.TextContent.model_construct(type="text", text=text)]
+
+
+# Responses to calls of unknown tools, by tool name.  Bounded so a client
+# probing many made-up names cannot grow it without limit.
+_UNKNOWN_TOOL_RESPONSES: FIFOCache = FIFOCache(maxsize=64)
+
+
+def _unknown_tool(name: str) -> list[types.TextContent]:
+    """Return the error response for a call to the unknown tool ``name``."""
+    response = _UNKNOWN_TOOL_RESPONSES.get(name)
+    if response is None:
+        response = _UNKNOWN_TOOL_RESPONSES[name] = _text_content(f"Error: Unknown tool '{name}'")
+    return response
+
+
+async def _dispatch(name: str, arguments: dict) -> list[types.TextContent]:
+    """Run the tool called ``name`` and return its result as JSON text.
+
+    The arguments are checked against the tool's compiled input schema and
+    passed to the tool's function as described by its ``_ToolSpec``.
+    Unknown tools, invalid arguments and errors raised by the tool are
+    reported back to the client as text.
+    """
+    spec = _TOOL_SPECS.get(name)
+    if spec is None:
+        return _unknown_tool(name)
+    try:
+        arguments = _VALIDATORS[name](arguments)
+        result = await spec.fn(**spec.parse(arguments))
+        return _text_content(_dumps(result))
+    except fastjsonschema.JsonSchemaValueException as e:
+        # An expected client error; a traceback would only point at the validator
+        logger.warning("Invalid arguments for tool %s: %s", name, e)
+        return _text_content(f"Error: {str(e)}")
+    except Exception as e:
+        logger.exception("Error executing tool %s: %s", name, e)
+        return _text_content(f"Error: {str(e)}")
+
 
 # New helper to build the MCP server without starting the ASGI app.
 # This allows tests to import and exercise the tool definitions and dispatcher
-# without invoking uvicorn.  The returned ``Server`` instance has the same
-# ``list_tools`` and ``call_tool`` methods as defined in :func:`main`.
-def build_mcp_server(json_response: bool = False) -> Server:
+# without invoking uvicorn.  :func:`create_app` serves the returned ``Server``
+# over both transports.
+def build_mcp_server(json_response: bool = False, server_cls: type[Server] = Server) -> Server:
     """
     Construct and return an MCP Server instance with all Exa tools registered.
 
     This function encapsulates the tool definitions and dispatch logic so they
-    can be reused outside of the CLI entrypoint.  It mirrors the behaviour of
-    the server created in ``main`` without setting up any transports or
+    can be reused outside of the CLI entrypoint.  It is the server that
+    :func:`create_app` serves, without setting up any transports or
     starting the ASGI application.  Tests can call this function to obtain
     a fresh server and verify the behaviour of ``list_tools`` and ``call_tool``.
 
     Args:
         json_response: Unused placeholder to match the signature of the CLI.
+        server_cls: The ``Server`` class to instantiate.  Tests pass a double
+            that records the registered handlers.
 
     Returns:
         A fully configured ``Server`` instance with tools registered.
     """
-    app = Server("exa-mcp-server")
+    app = server_cls("exa-mcp-server")
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
-        return [
-            # Search tool
-            types.Tool(
-                name="exa_web_search",
-                description=(
-                    "Perform a real-time web search via Exa and return a list of "
-                    "results with title, url, and snippet fields. Optionally "
-                    "include full text in each result."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The search query.",
-                        },
-                        "num_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return",
-                            "minimum": 1,
-                            "default": 3,
-                        },
-                        "include_text": {
-                            "type": "boolean",
-                            "description": "Whether to include full page text in each search result",
-                            "default": False,
-                        },
-                    },
-                    "required": ["query"],
-                },
-            ),
-            # Content retrieval tool
-            types.Tool(
-                name="exa_fetch_content",
-                description=(
-                    "Retrieve and read the full text content of a given URL using "
-                    "Exa's content retrieval API. Use after obtaining a URL from "
-                    "exa_web_search or other means."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The URL of the page to fetch.",
-                        },
-                    },
-                    "required": ["url"],
-                },
-            ),
-            # Bulk content retrieval tool
-            types.Tool(
-                name="exa_fetch_contents",
-                description=(
-                    "Retrieve the full text contents of multiple URLs in one call via Exa's "
-                    "contents API. Provide a list of URLs and optionally specify the "
-                    "livecrawl mode to control whether Exa should fetch fresh pages."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "urls": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "A list of URLs to fetch. Must contain at least one URL.",
-                        },
-                        "livecrawl": {
-                            "type": "string",
-                            "description": "Optional livecrawl mode: 'always', 'preferred', or 'never'.",
-                            "enum": ["always", "preferred", "never"],
-                        },
-                    },
-                    "required": ["urls"],
-                },
-            ),
-            # Subpage crawling tool
-            types.Tool(
-                name="exa_fetch_subpages",
-                description=(
-                    "Crawl a website and retrieve the contents of the root page and a number of "
-                    "its subpages. Use this when you need to explore beyond the main page, "
-                    "such as fetching 'about' or 'products' pages on a company site."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The root URL from which to crawl subpages.",
-                        },
-                        "subpages": {
-                            "type": "integer",
-                            "description": "Maximum number of subpages to crawl.",
-                            "minimum": 1,
-                            "default": 5,
-                        },
-                        "subpage_target": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional keywords used to prioritise which subpages to fetch.",
-                        },
-                        "livecrawl": {
-                            "type": "string",
-                            "description": "Optional livecrawl mode: 'always', 'preferred', or 'never'.",
-                            "enum": ["always", "preferred", "never"],
-                        },
-                    },
-                    "required": ["url"],
-                },
-            ),
-            # Find similar links tool
-            types.Tool(
-                name="exa_find_similar_links",
-                description=(
-                    "Given a URL, return a list of links with similar meaning "
-                    "using Exa's findSimilar API. Useful for discovering related "
-                    "articles or pages."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The URL to find similar links for.",
-                        },
-                        "include_text": {
-                            "type": "boolean",
-                            "description": "Whether to include the text of each similar page in the response.",
-                            "default": False,
-                        },
-                        "num_results": {
-                            "type": "integer",
-                            "description": "Maximum number of similar results to return",
-                            "minimum": 1,
-                            "default": 3,
-                        },
-                    },
-                    "required": ["url"],
-                },
-            ),
-            # Answer question tool
-            types.Tool(
-                name="exa_answer_question",
-                description=(
-                    "Ask a natural-language question and get a direct answer using "
-                    "Exa's Answer API. Returns both the answer and supporting "
-                    "citations."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The question to answer.",
-                        },
-                        "include_text": {
-                            "type": "boolean",
-                            "description": "Whether to include full text of supporting sources in the response.",
-                            "default": False,
-                        },
-                    },
-                    "required": ["query"],
-                },
-            ),
-            # Research start tool
-            types.Tool(
-                name="exa_research_start",
-                description=(
-                    "Start an asynchronous research task that uses Exa's "
-                    "agentic pipeline to search, reason, and synthesize an answer. "
-                    "Returns a task ID which you can poll to retrieve results."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "instructions": {
-                            "type": "string",
-                            "description": "Natural-language instructions describing the research task.",
-                        },
-                        "model": {
-                            "type": "string",
-                            "description": "Optional model to use for research (e.g. 'exa-research' or 'exa-research-pro').",
-                        },
-                        "output_schema": {
-                            "type": "object",
-                            "description": "Optional JSON Schema specifying the desired structured output.",
-                        },
-                    },
-                    "required": ["instructions"],
-                },
-            ),
-            # Research poll tool
-            types.Tool(
-                name="exa_research_poll",
-                description=(
-                    "Poll a previously created research task to check its status and "
-                    "retrieve results once complete."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "task_id": {
-                            "type": "string",
-                            "description": "The ID of the research task returned by exa_research_start.",
-                        }
-                    },
-                    "required": ["task_id"],
-                },
-            ),
-        ]
+        return list(_TOOLS)
 
-    @app.call_tool()
+    # Arguments are validated against the compiled schemas in ``_VALIDATORS``,
+    # so the server's own (uncompiled) input validation is switched off.
+    @app.call_tool(validate_input=False)
     async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
         """
         Dispatch calls to the appropriate Exa helper function based on tool name.
 
-        This function mirrors the behaviour defined in ``main`` but without
-        duplicating branches.  It validates inputs, invokes the corresponding
-        asynchronous helper and returns a list of ``TextContent`` results.  If
-        ``include_text`` is requested for web search, it enriches the search
-        results by calling the contents API in bulk and falling back to
-        per-page requests on failure.
+        See :func:`_dispatch`.
         """
-        try:
-            if name == "exa_web_search":
-                query: str | None = arguments.get("query")
-                if not query:
-                    raise ValueError("Argument 'query' is required")
-                num_results: int = arguments.get("num_results", 3)
-                include_text: bool = arguments.get("include_text", False)
-                results = await exa_web_search(query=query, num_results=num_results)
-                if include_text:
-                    urls = [item.get("url") for item in results if item.get("url")]
-                    try:
-                        contents = await exa_fetch_contents(urls=urls)
-                        url_to_content = {item.get("url"): item for item in contents}
-                        enriched_results: list[dict[str, Any]] = []
-                        for item in results:
-                            page_url = item.get("url")
-                            enriched_results.append(url_to_content.get(page_url, item))
-                        results = enriched_results
-                    except Exception:
-                        enriched_results = []
-                        for item in results:
-                            try:
-                                content = await exa_fetch_content(url=item.get("url"))
-                                enriched_results.append(content)
-                            except Exception:
-                                enriched_results.append(item)
-                        results = enriched_results
-                return [types.TextContent(type="text", text=json.dumps(results, indent=2))]
-            elif name == "exa_fetch_content":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                result = await exa_fetch_content(url=url)
-                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-            elif name == "exa_find_similar_links":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                include_text: bool = arguments.get("include_text", False)
-                num_results: int = arguments.get("num_results", 3)
-                results = await exa_find_similar_links(url=url, include_text=include_text, num_results=num_results)
-                return [types.TextContent(type="text", text=json.dumps(results, indent=2))]
-            elif name == "exa_fetch_contents":
-                urls: list | None = arguments.get("urls")
-                if not urls or not isinstance(urls, list):
-                    raise ValueError("Argument 'urls' must be a non-empty list")
-                livecrawl: str | None = arguments.get("livecrawl")
-                results = await exa_fetch_contents(urls=urls, livecrawl=livecrawl)
-                return [types.TextContent(type="text", text=json.dumps(results, indent=2))]
-            elif name == "exa_fetch_subpages":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                subpages: int = arguments.get("subpages", 5)
-                subpage_target = arguments.get("subpage_target")
-                if subpage_target and not isinstance(subpage_target, list):
-                    raise ValueError("Argument 'subpage_target' must be an array of strings if provided")
-                livecrawl: str | None = arguments.get("livecrawl")
-                result = await exa_fetch_subpages(url=url, subpages=subpages, subpage_target=subpage_target, livecrawl=livecrawl)
-                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-            elif name == "exa_answer_question":
-                query: str | None = arguments.get("query")
-                if not query:
-                    raise ValueError("Argument 'query' is required")
-                include_text: bool = arguments.get("include_text", False)
-                result = await exa_answer_question(query=query, include_text=include_text)
-                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-            elif name == "exa_research_start":
-                instructions: str | None = arguments.get("instructions")
-                if not instructions:
-                    raise ValueError("Argument 'instructions' is required")
-                model: str | None = arguments.get("model")
-                output_schema: dict | None = arguments.get("output_schema")
-                result = await exa_research_start(instructions=instructions, model=model, output_schema=output_schema)
-                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-            elif name == "exa_research_poll":
-                task_id: str | None = arguments.get("task_id")
-                if not task_id:
-                    raise ValueError("Argument 'task_id' is required")
-                result = await exa_research_poll(task_id=task_id)
-                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-            else:
-                return [types.TextContent(type="text", text=f"Error: Unknown tool '{name}'")]
-        except Exception as e:
-            logger.exception(f"Error executing tool {name}: {e}")
-            return [types.TextContent(type="text", text=f"Error: {str(e)}")]
+        return await _dispatch(name, arguments)
 
     return app
 
 
-@click.command()
-@click.option(
-    "--port", default=EXA_MCP_SERVER_PORT, help="Port to listen on for HTTP"
-)
-@click.option(
-    "--log-level",
-    default="INFO",
-    help="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)",
-)
-@click.option(
-    "--json-response",
-    is_flag=True,
-    default=False,
-    help="Enable JSON responses for StreamableHTTP instead of SSE streams",
-)
-def main(port: int, log_level: str, json_response: bool) -> int:
-    """Entry point for running the Exa MCP server.
-
-    Configures logging, sets up the MCP server with multiple tools, and runs
-    the underlying ASGI application using `uvicorn`.  The server exposes
-    both Server‑Sent Events and Streamable HTTP transports on separate
-    routes.  See the README for a list of available tools.
-    """
-    # Configure logging for the application
+def _configure_logging(log_level: str) -> None:
+    """Configure the root logger for the server process."""
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
-    # Create a throwaway legacy server instance for backward-compatibility.
-    # Tools and dispatcher will be registered on this instance but it will not be used
-    # for transport registration.  A new server is built via build_mcp_server below.
-    legacy_app = Server("exa-mcp-server")
-    # Build the actual MCP server with all tools/dispatcher registered
-    app = build_mcp_server(json_response=json_response)
 
-    # Define the list of tools the server provides
-    @legacy_app.list_tools()
-    async def list_tools() -> list[types.Tool]:
-        return [
-            # Search tool
-            types.Tool(
-                name="exa_web_search",
-                description=(
-                    "Perform a real‑time web search via Exa and return a list of "
-                    "results with title, url, and snippet fields. Optionally "
-                    "include full text in each result."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The search query.",
-                        },
-                        "num_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return",
-                            "minimum": 1,
-                            "default": 3,
-                        },
-                        "include_text": {
-                            "type": "boolean",
-                            "description": "Whether to include full page text in each search result",
-                            "default": False,
-                        },
-                    },
-                    "required": ["query"],
-                },
-            ),
-            # Content retrieval tool
-            types.Tool(
-                name="exa_fetch_content",
-                description=(
-                    "Retrieve and read the full text content of a given URL using "
-                    "Exa's content retrieval API. Use after obtaining a URL from "
-                    "exa_web_search or other means."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The URL of the page to fetch.",
-                        },
-                    },
-                    "required": ["url"],
-                },
-            ),
-            # Bulk content retrieval tool
-            types.Tool(
-                name="exa_fetch_contents",
-                description=(
-                    "Retrieve the full text contents of multiple URLs in one call via Exa's "
-                    "contents API. Provide a list of URLs and optionally specify the "
-                    "livecrawl mode to control whether Exa should fetch fresh pages."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "urls": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "A list of URLs to fetch. Must contain at least one URL.",
-                        },
-                        "livecrawl": {
-                            "type": "string",
-                            "description": "Optional livecrawl mode: 'always', 'preferred', or 'never'.",
-                            "enum": ["always", "preferred", "never"],
-                        },
-                    },
-                    "required": ["urls"],
-                },
-            ),
-            # Subpage crawling tool
-            types.Tool(
-                name="exa_fetch_subpages",
-                description=(
-                    "Crawl a website and retrieve the contents of the root page and a number of "
-                    "its subpages. Use this when you need to explore beyond the main page, "
-                    "such as fetching 'about' or 'products' pages on a company site."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The root URL from which to crawl subpages.",
-                        },
-                        "subpages": {
-                            "type": "integer",
-                            "description": "Maximum number of subpages to crawl.",
-                            "minimum": 1,
-                            "default": 5,
-                        },
-                        "subpage_target": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional keywords used to prioritise which subpages to fetch.",
-                        },
-                        "livecrawl": {
-                            "type": "string",
-                            "description": "Optional livecrawl mode: 'always', 'preferred', or 'never'.",
-                            "enum": ["always", "preferred", "never"],
-                        },
-                    },
-                    "required": ["url"],
-                },
-            ),
-            # Find similar links tool
-            types.Tool(
-                name="exa_find_similar_links",
-                description=(
-                    "Given a URL, return a list of links with similar meaning "
-                    "using Exa's findSimilar API. Useful for discovering related "
-                    "articles or pages."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The URL to find similar links for.",
-                        },
-                        "include_text": {
-                            "type": "boolean",
-                            "description": "Whether to include the text of each similar page in the response.",
-                            "default": False,
-                        },
-                        "num_results": {
-                            "type": "integer",
-                            "description": "Maximum number of similar results to return",
-                            "minimum": 1,
-                            "default": 3,
-                        },
-                    },
-                    "required": ["url"],
-                },
-            ),
-            # Answer question tool
-            types.Tool(
-                name="exa_answer_question",
-                description=(
-                    "Ask a natural‑language question and get a direct answer using "
-                    "Exa's Answer API. Returns both the answer and supporting "
-                    "citations."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The question to answer.",
-                        },
-                        "include_text": {
-                            "type": "boolean",
-                            "description": "Whether to include full text of supporting sources in the response.",
-                            "default": False,
-                        },
-                    },
-                    "required": ["query"],
-                },
-            ),
-            # Research start tool
-            types.Tool(
-                name="exa_research_start",
-                description=(
-                    "Start an asynchronous research task that uses Exa's "
-                    "agentic pipeline to search, reason, and synthesize an answer. "
-                    "Returns a task ID which you can poll to retrieve results."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "instructions": {
-                            "type": "string",
-                            "description": "Natural‑language instructions describing the research task.",
-                        },
-                        "model": {
-                            "type": "string",
-                            "description": "Optional model to use for research (e.g. 'exa-research' or 'exa-research-pro').",
-                        },
-                        "output_schema": {
-                            "type": "object",
-                            "description": "Optional JSON Schema specifying the desired structured output.",
-                        },
-                    },
-                    "required": ["instructions"],
-                },
-            ),
-            # Research poll tool
-            types.Tool(
-                name="exa_research_poll",
-                description=(
-                    "Poll a previously created research task to check its status and "
-                    "retrieve results once complete."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "task_id": {
-                            "type": "string",
-                            "description": "The ID of the research task returned by exa_research_start.",
-                        }
-                    },
-                    "required": ["task_id"],
-                },
-            ),
-        ]
-
-    # Define how to call each tool
-    @legacy_app.call_tool()
-    async def call_tool(
-        name: str, arguments: dict
-    ) -> list[types.TextContent]:
-        try:
-            if name == "exa_web_search":
-                # Extract required and optional parameters
-                query: str | None = arguments.get("query")
-                if not query:
-                    raise ValueError("Argument 'query' is required")
-                num_results: int = arguments.get("num_results", 3)
-                include_text: bool = arguments.get("include_text", False)
-                results = await exa_web_search(query=query, num_results=num_results)
-                # When include_text is requested, call contents API for each result
-                if include_text:
-                    # Collect the URLs from the search results to fetch content in bulk
-                    urls = [item.get("url") for item in results if item.get("url")]
-                    try:
-                        # Use the bulk contents API to enrich results in one request
-                        contents = await exa_fetch_contents(urls=urls)
-                        # Map fetched contents back to their original positions using order of URLs
-                        url_to_content = {item.get("url"): item for item in contents}
-                        enriched_results: list[dict[str, Any]] = []
-                        for item in results:
-                            page_url = item.get("url")
-                            enriched_results.append(url_to_content.get(page_url, item))
-                        results = enriched_results
-                    except Exception:
-                        # If the bulk fetch fails, fall back to per‑URL retrieval
-                        enriched_results: list[dict[str, Any]] = []
-                        for item in results:
-                            try:
-                                content = await exa_fetch_content(url=item.get("url"))
-                                enriched_results.append(content)
-                            except Exception:
-                                enriched_results.append(item)
-                        results = enriched_results
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(results, indent=2),
-                    )
-                ]
-            elif name == "exa_fetch_content":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                result = await exa_fetch_content(url=url)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2),
-                    )
-                ]
-            elif name == "exa_find_similar_links":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                include_text: bool = arguments.get("include_text", False)
-                num_results: int = arguments.get("num_results", 3)
-                results = await exa_find_similar_links(
-                    url=url, include_text=include_text, num_results=num_results
-                )
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(results, indent=2),
-                    )
-                ]
-            elif name == "exa_fetch_contents":
-                urls: list | None = arguments.get("urls")
-                if not urls or not isinstance(urls, list):
-                    raise ValueError("Argument 'urls' must be a non‑empty list")
-                livecrawl: str | None = arguments.get("livecrawl")
-                results = await exa_fetch_contents(urls=urls, livecrawl=livecrawl)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(results, indent=2),
-                    )
-                ]
-            elif name == "exa_fetch_subpages":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                subpages: int = arguments.get("subpages", 5)
-                subpage_target = arguments.get("subpage_target")
-                # Ensure subpage_target is a list if provided
-                if subpage_target and not isinstance(subpage_target, list):
-                    raise ValueError("Argument 'subpage_target' must be an array of strings if provided")
-                livecrawl: str | None = arguments.get("livecrawl")
-                result = await exa_fetch_subpages(
-                    url=url,
-                    subpages=subpages,
-                    subpage_target=subpage_target,
-                    livecrawl=livecrawl,
-                )
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2),
-                    )
-                ]
-            elif name == "exa_fetch_contents":
-                urls: list | None = arguments.get("urls")
-                if not urls or not isinstance(urls, list):
-                    raise ValueError("Argument 'urls' must be a non‑empty list")
-                livecrawl: str | None = arguments.get("livecrawl")
-                results = await exa_fetch_contents(urls=urls, livecrawl=livecrawl)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(results, indent=2),
-                    )
-                ]
-            elif name == "exa_fetch_subpages":
-                url: str | None = arguments.get("url")
-                if not url:
-                    raise ValueError("Argument 'url' is required")
-                subpages: int = arguments.get("subpages", 5)
-                subpage_target = arguments.get("subpage_target")
-                # Ensure subpage_target is a list if provided
-                if subpage_target and not isinstance(subpage_target, list):
-                    raise ValueError("Argument 'subpage_target' must be an array of strings if provided")
-                livecrawl: str | None = arguments.get("livecrawl")
-                result = await exa_fetch_subpages(
-                    url=url,
-                    subpages=subpages,
-                    subpage_target=subpage_target,
-                    livecrawl=livecrawl,
-                )
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2),
-                    )
-                ]
-            elif name == "exa_answer_question":
-                query: str | None = arguments.get("query")
-                if not query:
-                    raise ValueError("Argument 'query' is required")
-                include_text: bool = arguments.get("include_text", False)
-                result = await exa_answer_question(query=query, include_text=include_text)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2),
-                    )
-                ]
-            elif name == "exa_research_start":
-                instructions: str | None = arguments.get("instructions")
-                if not instructions:
-                    raise ValueError("Argument 'instructions' is required")
-                model: str | None = arguments.get("model")
-                output_schema: dict | None = arguments.get("output_schema")
-                result = await exa_research_start(
-                    instructions=instructions,
-                    model=model,
-                    output_schema=output_schema,
-                )
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2),
-                    )
-                ]
-            elif name == "exa_research_poll":
-                task_id: str | None = arguments.get("task_id")
-                if not task_id:
-                    raise ValueError("Argument 'task_id' is required")
-                result = await exa_research_poll(task_id=task_id)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2),
-                    )
-                ]
-            else:
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=f"Error: Unknown tool '{name}'",
-                    )
-                ]
-        except Exception as e:
-            logger.exception(f"Error executing tool {name}: {e}")
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"Error: {str(e)}",
-                )
-            ]
+# Environment variable ``main`` uses to hand the log level to worker processes
+_WORKER_LOG_LEVEL_ENV = "EXA_MCP_WORKER_LOG_LEVEL"
+
+
+def _create_worker_app() -> Starlette:
+    """Build the application in a worker process started by ``main``.
+
+    Worker processes do not run ``main``, so logging is configured here.
+    """
+    _configure_logging(os.getenv(_WORKER_LOG_LEVEL_ENV, "INFO"))
+    return create_app()
+
+
+def create_app(json_response: bool | None = None, debug: bool | None = None) -> Starlette:
+    """Build the ASGI application serving the Exa MCP server.
+
+    The application exposes both Server‑Sent Events and Streamable HTTP
+    transports on separate routes, plus a health check.  Worker processes
+    build it through :func:`_create_worker_app` when the server runs
+    several of them.
+
+    Args:
+        json_response: Enable JSON responses for StreamableHTTP instead of
+            SSE streams.  Defaults to ``EXA_MCP_JSON_RESPONSE``.
+        debug: Run Starlette in debug mode, which returns tracebacks in error
+            responses.  Defaults to ``EXA_MCP_DEBUG``.
+
+    Returns:
+        The Starlette application.
+    """
+    if json_response is None:
+        json_response = get_config().json_response
+    if debug is None:
+        debug = get_config().debug
+    # Build the MCP server with all tools/dispatcher registered
+    app = build_mcp_server(json_response=json_response)
 
     # Configure transports for SSE and Streamable HTTP
     sse = SseServerTransport(server=app)
@@ -1227,14 +1396,22 @@ def main(port: int, log_level: str, json_response: bool) -> int:
     async def health(request):  # type: ignore[override]
         return Response("OK")
 
+    @contextlib.asynccontextmanager
     async def lifespan(app: Starlette) -> AsyncIterator[None]:
         logger.info("Application startup...")
-        yield
-        logger.info("Application shutting down...")
+        # Open the shared Exa client up front; it lives until shutdown
+        await _get_client()
+        prewarm = asyncio.create_task(_prewarm())
+        try:
+            yield
+        finally:
+            logger.info("Application shutting down...")
+            prewarm.cancel()
+            await _close_client()
 
     # Assemble the ASGI application
     starlette_app = Starlette(
-        debug=True,
+        debug=debug,
         routes=[
             # SSE endpoint
             Route("/sse", endpoint=handle_sse, methods=["GET"]),
@@ -1245,20 +1422,97 @@ def main(port: int, log_level: str, json_response: bool) -> int:
             # Simple health check
             Route("/health", endpoint=health, methods=["GET"]),
         ],
+        # Compress large JSON bodies for clients that accept gzip.  From
+        # Starlette 0.46, hence the pin in requirements.txt, GZipMiddleware
+        # leaves ``text/event-stream`` responses uncompressed, so SSE
+        # messages are still delivered as they are sent.
+        middleware=[Middleware(GZipMiddleware, minimum_size=EXA_GZIP_MIN_BYTES, compresslevel=5)],
         lifespan=lifespan,
     )
 
-    logger.info(f"Server starting on port {port} with dual transports:")
-    logger.info(f"  - SSE endpoint: http://localhost:{port}/sse")
-    logger.info(f"  - StreamableHTTP endpoint: http://localhost:{port}/mcp")
+    return starlette_app
+
+
+@click.command()
+@click.option(
+    "--port",
+    type=int,
+    default=None,
+    help="Port to listen on for HTTP (defaults to EXA_MCP_SERVER_PORT, or 5000)",
+)
+@click.option(
+    "--log-level",
+    default="INFO",
+    help="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)",
+)
+@click.option(
+    "--json-response",
+    is_flag=True,
+    default=False,
+    help="Enable JSON responses for StreamableHTTP instead of SSE streams",
+)
+@click.option(
+    "--debug",
+    is_flag=True,
+    default=False,
+    help="Run Starlette in debug mode, returning tracebacks in error responses (development only)",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes (see the README before using more than one)",
+)
+def main(port: int | None, log_level: str, json_response: bool, debug: bool, workers: int) -> int:
+    """Entry point for running the Exa MCP server.
+
+    Configures logging, sets up the MCP server with multiple tools, and runs
+    the underlying ASGI application using `uvicorn`.  The server exposes
+    both Server‑Sent Events and Streamable HTTP transports on separate
+    routes.  See the README for a list of available tools.
+    """
+    if port is None:
+        port = get_config().port
+    _configure_logging(log_level)
+
+    logger.info("Server starting on port %s with dual transports:", port)
+    logger.info("  - SSE endpoint: http://localhost:%s/sse", port)
+    logger.info("  - StreamableHTTP endpoint: http://localhost:%s/mcp", port)
 
     # Run the ASGI application using uvicorn
     import uvicorn  # Imported here to avoid dependency at import time when running tests
 
-    uvicorn.run(starlette_app, host="0.0.0.0", port=port)
+    # uvicorn[standard] provides uvloop and httptools, which uvicorn picks
+    # automatically where they are available.  Per-request access logging is
+    # off; tool calls are logged by the server itself.
+    if workers == 1:
+        uvicorn.run(
+            create_app(json_response or None, debug or None),
+            host="0.0.0.0",
+            port=port,
+            access_log=False,
+        )
+    else:
+        # Each worker builds its own app from the factory, so settings given
+        # on the command line are handed over through the environment.
+        if json_response:
+            os.environ["EXA_MCP_JSON_RESPONSE"] = "true"
+        if debug:
+            os.environ["EXA_MCP_DEBUG"] = "true"
+        os.environ[_WORKER_LOG_LEVEL_ENV] = log_level
+        logger.info("Starting %s worker processes", workers)
+        uvicorn.run(
+            "server:_create_worker_app",
+            factory=True,
+            workers=workers,
+            host="0.0.0.0",
+            port=port,
+            access_log=False,
+            log_level=log_level.lower(),
+        )
 
     return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()